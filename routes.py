@@ -2,9 +2,12 @@ import os
 import platform
 import random
 import subprocess
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 from urllib.parse import unquote
-from flask import Flask, render_template, abort, send_from_directory, request, redirect, url_for, jsonify, g, send_file, current_app
+from flask import Flask, Response, render_template, abort, send_from_directory, request, redirect, url_for, jsonify, g, send_file, current_app, make_response
 from src.file_handler import (
     AccessDenied,
     BookmarkNotFound,
@@ -12,6 +15,7 @@ from src.file_handler import (
     ExternalServiceError,
     FolderNotFound,
     MediaNotFound,
+    entries_to_dicts,
     get_all_folders_info,
     get_folder_images,
     get_image_details,
@@ -41,6 +45,18 @@ SYSTEM_NAME = platform.system()
 IS_MACOS = SYSTEM_NAME == "Darwin"
 IS_WINDOWS = SYSTEM_NAME == "Windows"
 
+FOLDER_VIEW_TEMPLATES = {
+    "both": "view_both.html",
+    "grid": "view_grid.html",
+    "slide": "view_slide.html",
+}
+# 未帶 src 時各版型的預設來源：both 為 external；grid / slide 沿用舊行為交給 get_folder_images 預設（internal）
+FOLDER_VIEW_DEFAULT_SOURCES = {
+    "both": "external",
+    "grid": None,
+    "slide": None,
+}
+
 
 def _path_is_within_roots(target_path, roots):
     """Ensure the requested path stays inside one of the configured roots."""
@@ -74,7 +90,7 @@ def _to_dict(obj):
 
 def _serialize_payload(metadata, data):
     meta_dict = _to_dict(metadata)
-    items = [_to_dict(item) for item in data]
+    items = entries_to_dicts(data)
     return meta_dict, items
 
 
@@ -95,9 +111,10 @@ def _compute_feature_flags():
 
 
 def _get_feature_flags():
-    if not hasattr(g, "feature_flags"):
-        g.feature_flags = _compute_feature_flags()
-    return g.feature_flags
+    flags = g.get("feature_flags")
+    if flags is None:
+        flags = g.feature_flags = _compute_feature_flags()
+    return flags
 
 
 def require_feature(flag_name):
@@ -113,6 +130,48 @@ def require_feature(flag_name):
     return decorator
 
 
+_RESPONSE_CACHE = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+_RESPONSE_CACHE_MAX_ENTRIES = 128
+
+
+def _response_cache_key():
+    """(endpoint, 路徑參數, 查詢參數)；參數排序後作為鍵，與查詢字串的書寫順序無關。"""
+    return (
+        request.endpoint,
+        tuple(sorted((request.view_args or {}).items())),
+        tuple(sorted(request.args.items(multi=True))),
+    )
+
+
+def cached_response(ttl=30):
+    """Decorator caching successful rendered responses per (endpoint, args) for ``ttl`` seconds."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(*args, **kwargs):
+            key = _response_cache_key()
+            now = time.monotonic()
+            with _RESPONSE_CACHE_LOCK:
+                entry = _RESPONSE_CACHE.get(key)
+                if entry and entry[0] > now:
+                    _RESPONSE_CACHE.move_to_end(key)
+                    return Response(entry[1], mimetype=entry[2])
+
+            response = make_response(view_func(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                with _RESPONSE_CACHE_LOCK:
+                    # 寫入時順便清掉過期項目，並以 LRU 上限防止任意查詢字串讓快取無限成長
+                    for stale_key in [k for k, (expires, _, _) in _RESPONSE_CACHE.items() if expires <= now]:
+                        del _RESPONSE_CACHE[stale_key]
+                    _RESPONSE_CACHE[key] = (now + ttl, response.get_data(), response.mimetype)
+                    _RESPONSE_CACHE.move_to_end(key)
+                    while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAX_ENTRIES:
+                        _RESPONSE_CACHE.popitem(last=False)
+            return response
+        return wrapped
+    return decorator
+
+
 def _normalize_current_url():
     """Strip the trailing ? from request.full_path to keep return_to clean."""
     current_url = request.full_path
@@ -296,24 +355,30 @@ def _register_filesystem_routes(app):
 
 
 def _register_folder_routes(app):
-    @app.route('/both/<path:folder_path>/')
-    def view_both(folder_path):
+    def view_folder(mode, folder_path):
         """
-        取得指定資料夾內的所有圖片
+        取得指定資料夾內的所有圖片，依 mode 切換版型（both / grid / slide）
         src: internal or external
         """
-        source = request.args.get('src', 'external')
-        return _render_media_view('view_both.html', folder_path, source)
-
-    @app.route('/grid/<path:folder_path>/')
-    def view_grid(folder_path):
-        """取得指定資料夾內的所有圖片（Grid 模式）"""
-        return _render_media_view('view_grid.html', folder_path)
-
-    @app.route('/slide/<path:folder_path>/')
-    def view_slide(folder_path):
-        """取得指定資料夾內的所有圖片（Slide 模式）"""
-        return _render_media_view('view_slide.html', folder_path)
+        template_name = FOLDER_VIEW_TEMPLATES.get(mode)
+        if template_name is None:
+            abort(404)
+        source = request.args.get('src', FOLDER_VIEW_DEFAULT_SOURCES[mode])
+        return _render_media_view(template_name, folder_path, source)
+
+    app.add_url_rule(
+        '/view/<any(both, grid, slide):mode>/<path:folder_path>/',
+        'view_folder',
+        view_folder,
+    )
+    # 舊網址 (/both/、/grid/、/slide/) 保留為同一個 handler 的別名
+    for mode in FOLDER_VIEW_TEMPLATES:
+        app.add_url_rule(
+            f'/{mode}/<path:folder_path>/',
+            f'view_{mode}',
+            view_folder,
+            defaults={'mode': mode},
+        )
 
     @app.route('/collections/')
     @require_feature("db")
@@ -473,6 +538,7 @@ def _register_chrome_routes(app):
 def _register_eagle_routes(app):
     @app.route('/EAGLE_folders/')
     @require_feature("eagle")
+    @cached_response(ttl=30)
     def list_all_eagle_folder():
         """列出所有 Eagle 資料夾，並符合 EAGLE API 樣式"""
         try:
@@ -484,6 +550,7 @@ def _register_eagle_routes(app):
 
     @app.route('/EAGLE_tags/')
     @require_feature("eagle")
+    @cached_response(ttl=30)
     def list_eagle_tags():
         """列出 Eagle 中的所有標籤並提供連結"""
         try:
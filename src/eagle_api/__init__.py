@@ -1,9 +1,14 @@
 # import os
 import requests
+from requests.adapters import HTTPAdapter
 # import numpy as np
 import pandas as pd
 from bs4 import BeautifulSoup
 from typing import List, Optional, Dict, Union
+try:  # 選用加速：有安裝 orjson 時用來解析 API 回應
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
 
 ### EAPLE API documents url:
@@ -21,17 +26,24 @@ from typing import List, Optional, Dict, Union
 
 ############################################# 操作資料夾相關 #############################################
 
+# 共用連線池：本機 Eagle API 支援 keep-alive，重複使用 TCP 連線省去每次請求的握手
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
+
 # 通用請求函數
 def send_request_to_eagle(endpoint: str, method: str = "GET", payload: dict = None) -> Dict[str, Union[bool, Dict, str]]:
     url = f"http://localhost:41595/api/{endpoint}"
     try:
         if method == "GET":
-            response = requests.get(url, params=payload)
+            response = _SESSION.get(url, params=payload)
         elif method == "POST":
-            response = requests.post(url, json=payload)
+            response = _SESSION.post(url, json=payload)
         response.raise_for_status()
-        return response.json()     # {"status": "success", "data": }
-    except requests.RequestException as e:
+        if orjson is not None:
+            return orjson.loads(response.content)     # {"status": "success", "data": }
+        return response.json()
+    except (requests.RequestException, ValueError) as e:
         return {"status": "error", "data": str(e)}  # 保持與 API 返回結構一致
     
 # 資料夾相關操作
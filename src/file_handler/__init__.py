@@ -18,6 +18,7 @@ from .models import (
     MediaError,
     MediaNotFound,
     PageMetadata,
+    entries_to_dicts,
 )
 from .chrome_bookmarks import (
     get_chrome_bookmarks,
@@ -65,6 +66,7 @@ __all__ = [
     "MediaError",
     "MediaNotFound",
     "PageMetadata",
+    "entries_to_dicts",
     "get_chrome_bookmarks",
     "get_chrome_youtube_bookmarks",
     "has_chrome_bookmarks",
@@ -1,17 +1,51 @@
 """Chrome bookmarks and focus-mode handling for Flowinone."""
 
+import copy
 import json
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from urllib.parse import quote, quote_plus
 
+try:  # Optional speedups; stdlib json is used when they are missing.
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
 from config import CHROME_BOOKMARK_PATH
-from .media_cache import CACHE_DATA_DIR, cache_thumbnail_for_bookmark, extract_youtube_id
+from .media_cache import CACHE_DATA_DIR, cache_thumbnails_for_bookmarks, extract_youtube_id
 from .models import BookmarkError, BookmarkNotFound, MediaEntry, PageMetadata
 from .paths import DEFAULT_THUMBNAIL_ROUTE
 
 
+def _json_loads(data: bytes):
+    """Decode JSON bytes, preferring orjson; both paths raise ValueError subclasses."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Encode ``obj`` as indented UTF-8 JSON bytes (non-ASCII kept as-is)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
 FOCUS_MODES_FILE = Path(CACHE_DATA_DIR) / "focus_modes.json"
 _DEFAULT_FOCUS_CONFIG = {
     "default_mode": "all",
@@ -25,6 +59,13 @@ _DEFAULT_FOCUS_CONFIG = {
 }
 
 
+def _write_focus_config_atomically(config: dict) -> None:
+    """Write the focus-mode file via a temp file + os.replace so readers never see partial JSON."""
+    tmp_path = FOCUS_MODES_FILE.with_suffix(".json.tmp")
+    tmp_path.write_bytes(_json_dumps(config))
+    os.replace(tmp_path, FOCUS_MODES_FILE)
+
+
 def _load_or_create_focus_config() -> dict:
     """
     Ensure the focus-mode configuration exists on disk and return its raw content.
@@ -32,22 +73,19 @@ def _load_or_create_focus_config() -> dict:
     try:
         FOCUS_MODES_FILE.parent.mkdir(parents=True, exist_ok=True)
     except OSError:
-        return json.loads(json.dumps(_DEFAULT_FOCUS_CONFIG))
+        return copy.deepcopy(_DEFAULT_FOCUS_CONFIG)
 
     if not FOCUS_MODES_FILE.exists():
         try:
-            FOCUS_MODES_FILE.write_text(
-                json.dumps(_DEFAULT_FOCUS_CONFIG, ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
+            _write_focus_config_atomically(_DEFAULT_FOCUS_CONFIG)
         except OSError:
-            return json.loads(json.dumps(_DEFAULT_FOCUS_CONFIG))
-        return json.loads(json.dumps(_DEFAULT_FOCUS_CONFIG))
+            pass
+        return copy.deepcopy(_DEFAULT_FOCUS_CONFIG)
 
     try:
-        return json.loads(FOCUS_MODES_FILE.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
-        return json.loads(json.dumps(_DEFAULT_FOCUS_CONFIG))
+        return _json_loads(FOCUS_MODES_FILE.read_bytes())
+    except (ValueError, OSError):
+        return copy.deepcopy(_DEFAULT_FOCUS_CONFIG)
 
 
 def _sanitize_focus_config(raw_config: dict) -> Dict[str, object]:
@@ -109,6 +147,7 @@ def _sanitize_focus_config(raw_config: dict) -> Dict[str, object]:
             "exclude_keywords_lower": [value.lower() for value in exclude_keywords],
             "exclude_urls": exclude_urls,
             "exclude_urls_lower": [value.lower() for value in exclude_urls],
+            "is_trivial": not (keywords or folders or include_urls or exclude_keywords or exclude_urls),
         })
 
     if "all" not in seen:
@@ -126,9 +165,16 @@ def _sanitize_focus_config(raw_config: dict) -> Dict[str, object]:
             "exclude_keywords_lower": [],
             "exclude_urls": [],
             "exclude_urls_lower": [],
+            "is_trivial": True,
         })
         seen.add("all")
 
+    # Matchers and URL-quoted ids are built once here so cached configs can reuse them across requests.
+    # Modes without any filter list match everything and behave like "all".
+    for mode in modes:
+        mode["_matcher"] = None if mode["is_trivial"] else _build_focus_matcher(mode)
+        mode["_quoted_id"] = quote_plus(mode["id"])
+
     default_mode_raw = raw_config.get("default_mode") if isinstance(raw_config, dict) else "all"
     default_mode = str(default_mode_raw or "all").strip().lower()
     if default_mode not in seen:
@@ -140,102 +186,266 @@ def _sanitize_focus_config(raw_config: dict) -> Dict[str, object]:
     }
 
 
+_FOCUS_CONFIG_CACHE = {"key": None, "config": None}
+_FOCUS_CONFIG_LOCK = threading.Lock()
+
+
+def _focus_config_mtime() -> Optional[int]:
+    try:
+        return FOCUS_MODES_FILE.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
 def _get_focus_mode_config() -> Dict[str, object]:
     """
-    Return the normalised focus-mode configuration.
+    Return the normalised focus-mode configuration, re-reading the file only when its mtime changes.
+
+    The returned dict is shared between callers and must be treated as read-only.
     """
+    cache_key = _focus_config_mtime()
+    with _FOCUS_CONFIG_LOCK:
+        if cache_key is not None and _FOCUS_CONFIG_CACHE["key"] == cache_key:
+            return _FOCUS_CONFIG_CACHE["config"]
+
     raw_config = _load_or_create_focus_config()
-    return _sanitize_focus_config(raw_config)
+    config = _sanitize_focus_config(raw_config)
+
+    # Cache under the mtime seen before loading: if the file changed during the load, the
+    # next call sees a newer mtime and reloads. No mtime (file just created) -> don't cache.
+    if cache_key is not None:
+        with _FOCUS_CONFIG_LOCK:
+            _FOCUS_CONFIG_CACHE.update({"key": cache_key, "config": config})
+    return config
+
+
+def _compile_token_search(tokens: List[str]):
+    """
+    Return a predicate telling whether any of the tokens occurs in a text, or None when empty.
+
+    Uses a single-pass Aho-Corasick automaton for 3+ tokens when pyahocorasick is installed.
+    """
+    if not tokens:
+        return None
+
+    # Drop duplicate tokens so each one is scanned only once.
+    exact = frozenset(tokens)
+
+    # Keep the scan in C: unrolled `in` checks for short lists, a regex alternation when
+    # pyahocorasick is unavailable.
+    if len(exact) == 1:
+        (only,) = exact
+        return lambda text: only in text
+    if len(exact) == 2:
+        first, second = exact
+        return lambda text: first in text or second in text
+    if ahocorasick is None:
+        pattern = re.compile("|".join(re.escape(token) for token in exact))
+        return lambda text: pattern.search(text) is not None
+
+    automaton = ahocorasick.Automaton()
+    for token in exact:
+        automaton.add_word(token, True)
+    automaton.make_automaton()
+    return lambda text: next(automaton.iter(text), None) is not None
+
+
+def _join_path_blob(folder_labels: Optional[Sequence[str]]) -> str:
+    """Lowercased " / "-joined folder path used by folder-term matching."""
+    return " / ".join(label.lower() for label in folder_labels or [] if label)
+
+
+def _bookmark_text_blob(name: str, path_blob: str, description: Optional[str] = None) -> str:
+    """Lowercased name/description/path text searched by keyword matching."""
+    # Lowercase the joined blob once; str.lower already has an ASCII fast path in CPython.
+    if description:
+        text_blob = f"{name} {description}".lower() if name else description.lower()
+    else:
+        text_blob = name.lower() if name else ""
+    if path_blob:
+        text_blob = f"{text_blob} {path_blob}" if text_blob else path_blob
+    return text_blob
 
 
 def _build_focus_matcher(mode: Dict[str, object]):
     """
     Build a predicate that checks whether a bookmark matches the supplied focus mode.
+
+    Checks run cheapest-first (URL, then folder path, then the name/path text blob) and the
+    text blob is only built when a keyword list still needs it.
     """
-    keywords = mode.get("keywords_lower", []) or []
-    folder_terms = mode.get("folders_lower", []) or []
-    include_urls = mode.get("include_urls_lower", []) or []
-    exclude_keywords = mode.get("exclude_keywords_lower", []) or []
-    exclude_urls = mode.get("exclude_urls_lower", []) or []
+    keywords = _compile_token_search(mode.get("keywords_lower", []) or [])
+    folder_terms = _compile_token_search(mode.get("folders_lower", []) or [])
+    include_urls = _compile_token_search(mode.get("include_urls_lower", []) or [])
+    exclude_keywords = _compile_token_search(mode.get("exclude_keywords_lower", []) or [])
+    exclude_urls = _compile_token_search(mode.get("exclude_urls_lower", []) or [])
+    has_positive_checks = bool(keywords or folder_terms or include_urls)
 
     def _match(name: str = "",
                url: Optional[str] = None,
                description: Optional[str] = None,
-               folder_labels: Optional[List[str]] = None) -> bool:
-        url_lower = (url or "").lower()
-        labels = folder_labels or []
-        path_blob = " / ".join(label.lower() for label in labels if label)
-        text_blob_parts = [name or ""]
-        if description:
-            text_blob_parts.append(description)
-        if path_blob:
-            text_blob_parts.append(path_blob)
-        text_blob = " ".join(part.lower() for part in text_blob_parts if part)
-
-        if exclude_urls and any(token in url_lower for token in exclude_urls):
-            return False
-        if exclude_keywords and any(token in text_blob for token in exclude_keywords):
+               folder_labels: Optional[Sequence[str]] = None,
+               path_blob: Optional[str] = None) -> bool:
+        url_lower = url.lower() if url else ""
+        if exclude_urls and exclude_urls(url_lower):
             return False
+        matched = bool(include_urls and include_urls(url_lower))
 
-        positive_checks = []
-        if keywords:
-            positive_checks.append(any(token in text_blob for token in keywords))
-        if folder_terms:
-            positive_checks.append(any(token in path_blob for token in folder_terms))
-        if include_urls:
-            positive_checks.append(any(token in url_lower for token in include_urls))
+        if path_blob is None:
+            path_blob = _join_path_blob(folder_labels)
+        if not matched and folder_terms and folder_terms(path_blob):
+            matched = True
 
-        if not positive_checks:
-            return True
+        if exclude_keywords or (keywords and not matched):
+            text_blob = _bookmark_text_blob(name, path_blob, description)
+            if exclude_keywords and exclude_keywords(text_blob):
+                return False
+            if not matched and keywords and keywords(text_blob):
+                matched = True
 
-        return any(positive_checks)
+        return matched or not has_positive_checks
 
     return _match
 
 
-def _count_focus_matches(node: dict,
-                         matcher,
-                         parent_labels: List[str],
-                         cache: Dict[str, int]) -> int:
+def _scan_focus_subtree(node: dict,
+                        matcher,
+                        parent_labels: Sequence[str]) -> Tuple[int, Dict[int, int]]:
     """
-    Count the number of bookmarks within a node (recursively) that match the focus mode.
+    Walk a bookmark folder once and count the bookmarks (including subfolders) matching the focus mode.
+
+    Returns ``(total, counts)`` where ``counts`` is keyed by ``id(node)``: every folder in the
+    subtree maps to its own total, and each matching direct bookmark of ``node`` maps to 1, so
+    the listing pass can read per-child results without calling the matcher again.
+    """
+    counts: Dict[int, int] = {}
+
+    # Frames are [node_key, total, parent_frame]; they are created in pre-order, so walking
+    # them in reverse settles every folder before its parent.
+    frames: List[list] = []
+    stack = [(node, tuple(parent_labels), None)]
+    while stack:
+        current, labels, parent_frame = stack.pop()
+        current_labels = labels + (current.get("name") or "(未命名資料夾)",)
+        path_blob = _join_path_blob(current_labels)
+        frame = [id(current), 0, parent_frame]
+        frames.append(frame)
+
+        for child in current.get("children", []) or []:
+            child_type = child.get("type")
+            if child_type == "url":
+                url = child.get("url") or ""
+                title = child.get("name") or url
+                if matcher(title, url=url, path_blob=path_blob):
+                    frame[1] += 1
+                    if parent_frame is None:
+                        counts[id(child)] = 1
+            elif child_type == "folder":
+                stack.append((child, current_labels, frame))
+
+    for node_key, total, parent_frame in reversed(frames):
+        counts[node_key] = total
+        if parent_frame is not None:
+            parent_frame[1] += total
+    return frames[0][1], counts
+
+
+# Thumbnail caching is network/disk bound, so listings resolve their bookmarks concurrently.
+_THUMBNAIL_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="bookmark-thumbnail")
+
+
+def _fill_bookmark_thumbnails(pending: List[Tuple[MediaEntry, dict]],
+                              default_sub_type: Optional[str] = None) -> None:
+    """
+    Resolve thumbnails for ``(entry, folder_meta)`` pairs in one batch and update the entries in place.
+    Cache bookkeeping is written in bulk; only the downloads run on the thumbnail executor.
     """
-    node_id = node.get("id") or "|".join(parent_labels + [node.get("name") or ""])
-    if node_id in cache:
-        return cache[node_id]
+    if not pending:
+        return
 
-    node_name = node.get("name") or "(未命名資料夾)"
-    current_labels = parent_labels + [node_name]
-    total = 0
+    bookmarks = [(entry.url, entry.name, folder_meta) for entry, folder_meta in pending]
+    resolved = cache_thumbnails_for_bookmarks(bookmarks, _THUMBNAIL_EXECUTOR)
+    for (entry, _), (thumbnail, sub_type) in zip(pending, resolved):
+        entry.thumbnail_route = thumbnail or DEFAULT_THUMBNAIL_ROUTE
+        entry.ext = sub_type or default_sub_type
 
-    for child in node.get("children", []) or []:
-        child_type = child.get("type")
-        if child_type == "url":
-            url = child.get("url") or ""
-            title = child.get("name") or url
-            if matcher(title, url=url, folder_labels=current_labels):
-                total += 1
-        elif child_type == "folder":
-            total += _count_focus_matches(child, matcher, current_labels, cache)
 
-    cache[node_id] = total
-    return total
+# Above this size the bookmarks file is stream-parsed (when ijson is available) so that
+# large siblings such as sync_metadata are never materialised.
+_BOOKMARKS_STREAM_THRESHOLD = 10 * 1024 * 1024
+_BOOKMARK_PARSE_ERRORS = (ValueError,) + ((ijson.JSONError,) if ijson is not None else ())
+
+_BOOKMARKS_CACHE = {"key": None, "data": None}
+_BOOKMARKS_CACHE_LOCK = threading.Lock()
+
+
+# id(folder) -> (folder, {child_id: child}); reset whenever the parsed bookmarks change.
+_CHILD_INDEX_CACHE: Dict[int, Tuple[dict, Dict[str, dict]]] = {}
+
+
+def _get_child_by_id(folder: dict, child_id: str) -> Optional[dict]:
+    """Look up a direct child by id through a per-folder index built on first access."""
+    entry = _CHILD_INDEX_CACHE.get(id(folder))
+    if entry is None or entry[0] is not folder:
+        index: Dict[str, dict] = {}
+        for child in folder.get("children", []) or []:
+            index.setdefault(child.get("id"), child)
+        entry = _CHILD_INDEX_CACHE[id(folder)] = (folder, index)
+    return entry[1].get(child_id)
+
+
+def _parse_bookmarks_file(path: str, size: int) -> dict:
+    """Parse the bookmarks file, streaming only the ``roots`` subtree when it is large."""
+    if ijson is not None and size > _BOOKMARKS_STREAM_THRESHOLD:
+        with open(path, "rb") as fh:
+            roots = {key: value for key, value in ijson.kvitems(fh, "roots", use_float=True)}
+        return {"roots": roots}
+
+    with open(path, "rb") as fh:
+        return _json_loads(fh.read())
 
 
 def _load_chrome_bookmarks():
-    if not os.path.exists(CHROME_BOOKMARK_PATH):
-        raise BookmarkNotFound(f"Chrome bookmark file missing: {CHROME_BOOKMARK_PATH}")
+    """
+    Return the parsed Chrome bookmarks, re-reading the file only when its mtime/size change.
+
+    The returned dict is shared between callers and must be treated as read-only.
+    """
     try:
-        with open(CHROME_BOOKMARK_PATH, "r", encoding="utf-8") as fh:
-            return json.load(fh)
-    except (json.JSONDecodeError, OSError) as exc:
+        st = os.stat(CHROME_BOOKMARK_PATH)
+    except FileNotFoundError as exc:
+        raise BookmarkNotFound(f"Chrome bookmark file missing: {CHROME_BOOKMARK_PATH}") from exc
+    except OSError as exc:
         raise BookmarkError(f"Failed to read Chrome bookmarks data: {exc}") from exc
 
+    cache_key = (CHROME_BOOKMARK_PATH, st.st_mtime_ns, st.st_size)
+    with _BOOKMARKS_CACHE_LOCK:
+        if _BOOKMARKS_CACHE["key"] == cache_key:
+            return _BOOKMARKS_CACHE["data"]
+
+    try:
+        data = _parse_bookmarks_file(CHROME_BOOKMARK_PATH, st.st_size)
+    except FileNotFoundError as exc:
+        raise BookmarkNotFound(f"Chrome bookmark file missing: {CHROME_BOOKMARK_PATH}") from exc
+    except (_BOOKMARK_PARSE_ERRORS + (OSError,)) as exc:
+        raise BookmarkError(f"Failed to read Chrome bookmarks data: {exc}") from exc
+
+    with _BOOKMARKS_CACHE_LOCK:
+        _BOOKMARKS_CACHE.update({"key": cache_key, "data": data})
+        _CHILD_INDEX_CACHE.clear()
+    return data
+
 
 def _find_chrome_node(bookmarks_root, path_parts):
+    """
+    Resolve ``path_parts`` to a bookmark node.
+
+    Returns ``(current, parent, parent_path, trail)`` where ``trail`` lists one
+    ``(part, label, node)`` tuple per path segment, ready for building breadcrumbs.
+    """
     roots = bookmarks_root.get("roots", {}) if bookmarks_root else {}
     if not path_parts:
-        return None, None, None
+        return None, None, None, []
 
     first = path_parts[0]
     current = roots.get(first)
@@ -245,23 +455,21 @@ def _find_chrome_node(bookmarks_root, path_parts):
     parent = None
     parent_path = ""
     current_path = first
+    trail = [(first, current.get("name") or ("Bookmarks" if first == "bookmark_bar" else first), current)]
 
     for part in path_parts[1:]:
         if current.get("type") != "folder":
             raise BookmarkNotFound("Parent is not a folder")
-        next_node = None
-        for child in current.get("children", []):
-            if child.get("id") == part:
-                next_node = child
-                break
+        next_node = _get_child_by_id(current, part)
         if next_node is None:
             raise BookmarkNotFound(f"Folder not found: {part}")
         parent = current
         parent_path = current_path
         current = next_node
         current_path = f"{current_path}/{part}"
+        trail.append((part, current.get("name") or "(未命名資料夾)", current))
 
-    return current, parent, parent_path
+    return current, parent, parent_path, trail
 
 
 def get_chrome_bookmarks(folder_path=None, focus_mode_id: Optional[str] = None):
@@ -276,7 +484,7 @@ def get_chrome_bookmarks(folder_path=None, focus_mode_id: Optional[str] = None):
     if not parts:
         raise BookmarkNotFound("Invalid bookmark path")
 
-    current, parent, parent_path = _find_chrome_node(bookmarks, parts)
+    current, parent, parent_path, trail = _find_chrome_node(bookmarks, parts)
     if current is None:
         raise BookmarkNotFound("Bookmark node not found")
 
@@ -290,42 +498,26 @@ def get_chrome_bookmarks(folder_path=None, focus_mode_id: Optional[str] = None):
     default_mode_id = str(focus_config.get("default_mode") or "all").strip().lower()
     active_mode = mode_lookup.get(requested_mode) or mode_lookup.get(default_mode_id) or focus_modes[0]
     active_mode_id = active_mode["id"]
-    matcher = None if active_mode_id == "all" else _build_focus_matcher(active_mode)
+    matcher = None
+    if active_mode_id != "all" and not active_mode.get("is_trivial"):
+        matcher = active_mode.get("_matcher") or _build_focus_matcher(active_mode)
 
-    query_suffix = f"?mode={quote_plus(active_mode_id)}" if active_mode_id else ""
+    query_suffix = f"?mode={active_mode.get('_quoted_id') or quote_plus(active_mode_id)}" if active_mode_id else ""
     base_path = f"/chrome/{quote(safe_path, safe='/')}"
 
     breadcrumb = []
-    breadcrumb_labels: List[str] = []
     path_cursor: List[str] = []
 
-    root_node = roots.get(parts[0])
-    if root_node is None:
-        raise BookmarkNotFound(f"Bookmark root missing: {parts[0]}")
-
-    current_node = root_node
-    for idx, part in enumerate(parts):
-        if idx == 0:
-            node_label = root_node.get("name") or ("Bookmarks" if part == "bookmark_bar" else part)
-        else:
-            if current_node.get("type") != "folder":
-                raise BookmarkNotFound("Unexpected non-folder node")
-            next_node = None
-            for child in current_node.get("children", []) or []:
-                if child.get("id") == part:
-                    next_node = child
-                    break
-            if next_node is None:
-                raise BookmarkNotFound(f"Bookmark folder not found: {part}")
-            current_node = next_node
-            node_label = current_node.get("name") or "(未命名資料夾)"
-
+    for part, node_label, _ in trail:
         path_cursor.append(part)
         breadcrumb.append({
             "name": node_label or "(未命名資料夾)",
             "url": f"/chrome/{quote('/'.join(path_cursor), safe='/')}{query_suffix}"
         })
-        breadcrumb_labels.append(node_label or "(未命名資料夾)")
+    # Shared (immutable) by every bookmark entry listed in this folder.
+    breadcrumb_labels: Tuple[str, ...] = tuple(crumb["name"] for crumb in breadcrumb)
+    breadcrumb_path_display = " / ".join(breadcrumb_labels)
+    bookmark_folder_meta = {"folder_path": breadcrumb_path_display}
 
     current_name = current.get("name") or (breadcrumb_labels[-1] if breadcrumb_labels else "(未命名資料夾)")
 
@@ -344,15 +536,16 @@ def get_chrome_bookmarks(folder_path=None, focus_mode_id: Optional[str] = None):
 
     children = current.get("children", []) or []
     data: List[MediaEntry] = []
-    match_cache: Dict[str, int] = {}
 
-    parent_labels_for_current = breadcrumb_labels[:-1] if breadcrumb_labels else []
+    parent_labels_for_current = breadcrumb_labels[:-1]
     total_focus_matches = None
+    focus_counts: Dict[int, int] = {}
     if matcher:
-        total_focus_matches = _count_focus_matches(current, matcher, parent_labels_for_current, match_cache)
+        total_focus_matches, focus_counts = _scan_focus_subtree(current, matcher, parent_labels_for_current)
 
     direct_bookmark_total = 0
     direct_bookmark_matches = 0
+    pending_thumbnails: List[Tuple[MediaEntry, dict]] = []
 
     for child in children:
         child_type = child.get("type")
@@ -362,11 +555,11 @@ def get_chrome_bookmarks(folder_path=None, focus_mode_id: Optional[str] = None):
             if not child_id:
                 continue
             child_path = f"{safe_path}/{child_id}"
-            folder_labels = breadcrumb_labels + [child_name]
+            folder_labels = breadcrumb_labels + (child_name,)
             description = None
 
             if matcher:
-                focus_count = _count_focus_matches(child, matcher, breadcrumb_labels, match_cache)
+                focus_count = focus_counts.get(id(child), 0)
                 if focus_count <= 0:
                     continue
                 description = f"{focus_count} 個專注書籤"
@@ -388,45 +581,36 @@ def get_chrome_bookmarks(folder_path=None, focus_mode_id: Optional[str] = None):
 
             direct_bookmark_total += 1
 
-            child_name = child.get("name") or url
-            folder_labels = list(breadcrumb_labels)
-            path_display = " / ".join(folder_labels)
-
-            matches_focus = True
-            if matcher:
-                matches_focus = matcher(child_name, url=url, folder_labels=folder_labels, description=path_display)
-
-            if not matches_focus:
+            if matcher and id(child) not in focus_counts:
                 continue
 
             direct_bookmark_matches += 1
 
-            folder_meta = {"folder_path": path_display}
-            thumbnail, sub_type = cache_thumbnail_for_bookmark(url, child_name, folder_meta)
-            thumbnail = thumbnail or DEFAULT_THUMBNAIL_ROUTE
-
-            data.append(MediaEntry(
-                name=child_name,
-                thumbnail_route=thumbnail,
+            entry = MediaEntry(
+                name=child.get("name") or url,
+                thumbnail_route=DEFAULT_THUMBNAIL_ROUTE,
                 url=url,
                 item_path=url,
                 media_type="bookmark",
-                ext=sub_type,
-                description=path_display or None,
-                folder_labels=folder_labels,
-                path_display=path_display
-            ))
+                description=breadcrumb_path_display or None,
+                folder_labels=breadcrumb_labels,
+                path_display=breadcrumb_path_display
+            )
+            data.append(entry)
+            pending_thumbnails.append((entry, bookmark_folder_meta))
 
-    focus_options = []
-    for mode in focus_modes:
-        mode_id = mode["id"]
-        focus_options.append({
-            "id": mode_id,
+    _fill_bookmark_thumbnails(pending_thumbnails)
+
+    focus_options = [
+        {
+            "id": mode["id"],
             "label": mode.get("label"),
             "description": mode.get("description"),
-            "is_active": mode_id == active_mode_id,
-            "url": f"{base_path}?mode={quote_plus(mode_id)}"
-        })
+            "is_active": mode["id"] == active_mode_id,
+            "url": f"{base_path}?mode={mode.get('_quoted_id') or quote_plus(mode['id'])}"
+        }
+        for mode in focus_modes
+    ]
 
     metadata.focus_modes = focus_options
     metadata.focus_mode = {
@@ -461,44 +645,55 @@ def get_chrome_bookmarks(folder_path=None, focus_mode_id: Optional[str] = None):
     return metadata, data
 
 
+_YOUTUBE_URL_HINT = "youtu"
+
+
 def get_chrome_youtube_bookmarks():
     bookmarks = _load_chrome_bookmarks()
     roots = bookmarks.get("roots", {})
     results: List[MediaEntry] = []
+    pending_thumbnails: List[Tuple[MediaEntry, dict]] = []
 
-    def _walk(node, path_labels):
+    # 以堆疊迭代走訪；子節點反向推入以維持原本的先序順序
+    stack: List[Tuple[dict, List[str]]] = []
+    for key in reversed(["bookmark_bar", "other", "synced", "mobile"]):
+        node = roots.get(key)
+        if not node:
+            continue
+        root_label = node.get("name") or key.replace("_", " ").title()
+        stack.append((node, [root_label]))
+
+    while stack:
+        node, path_labels = stack.pop()
         node_type = node.get("type")
         if node_type == "folder":
             label = node.get("name") or "(未命名資料夾)"
             new_path = path_labels + [label]
-            for child in node.get("children", []):
-                _walk(child, new_path)
+            for child in reversed(node.get("children", [])):
+                stack.append((child, new_path))
         elif node_type == "url":
             url = node.get("url")
+            # extract_youtube_id 只認得 youtube.com / youtu.be，先以字面子字串排除其他網址
+            if not url or _YOUTUBE_URL_HINT not in url:
+                continue
             video_id = extract_youtube_id(url)
             if not video_id:
-                return
+                continue
             label = node.get("name") or url
             folder_meta = {"folder_path": " / ".join(filter(None, path_labels))}
-            thumbnail, sub_type = cache_thumbnail_for_bookmark(url, label, folder_meta)
-            thumbnail = thumbnail or DEFAULT_THUMBNAIL_ROUTE
-            sub_type = sub_type or "youtube"
-            results.append(MediaEntry(
+            entry = MediaEntry(
                 name=label,
-                thumbnail_route=thumbnail,
+                thumbnail_route=DEFAULT_THUMBNAIL_ROUTE,
                 url=url,
                 item_path=url,
                 media_type="bookmark",
-                ext=sub_type,
+                ext="youtube",
                 description=folder_meta.get("folder_path")
-            ))
+            )
+            results.append(entry)
+            pending_thumbnails.append((entry, folder_meta))
 
-    for key in ["bookmark_bar", "other", "synced", "mobile"]:
-        node = roots.get(key)
-        if not node:
-            continue
-        root_label = node.get("name") or key.replace("_", " ").title()
-        _walk(node, [root_label])
+    _fill_bookmark_thumbnails(pending_thumbnails, default_sub_type="youtube")
 
     metadata = PageMetadata(
         name="YouTube 書籤",
@@ -512,5 +707,17 @@ def get_chrome_youtube_bookmarks():
     return metadata, results
 
 
+_HAS_BOOKMARKS_TTL = 1.0
+# (checked_at, exists) swapped as one tuple so concurrent readers never see a torn pair.
+_HAS_BOOKMARKS_CACHE = {"state": (float("-inf"), False)}
+
+
 def has_chrome_bookmarks() -> bool:
-    return os.path.isfile(CHROME_BOOKMARK_PATH)
+    """Report whether the bookmark file exists; the answer is reused for ``_HAS_BOOKMARKS_TTL`` seconds."""
+    now = time.monotonic()
+    checked_at, exists = _HAS_BOOKMARKS_CACHE["state"]
+    if now - checked_at < _HAS_BOOKMARKS_TTL:
+        return exists
+    exists = os.path.isfile(CHROME_BOOKMARK_PATH)
+    _HAS_BOOKMARKS_CACHE["state"] = (now, exists)
+    return exists
@@ -1,10 +1,10 @@
 """Eagle integration helpers for Flowinone."""
 
-import mimetypes
 import os
 import random
+import threading
 import time
-from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import src.eagle_api as EG
@@ -16,7 +16,7 @@ from .paths import (
     VIDEO_EXTENSIONS,
     _human_readable_size,
     _is_image_file,
-    _is_video_file,
+    _mime_for_ext,
     _normalize_slashes,
 )
 
@@ -37,11 +37,46 @@ def is_eagle_available(force: bool = False) -> bool:
     return available
 
 
+_LIBRARY_INFO_TTL = 30.0
+_LIBRARY_INFO_CACHE = {"expires": 0.0, "value": None}
+_LIBRARY_INFO_LOCK = threading.Lock()
+
+
+def _cached_library_info():
+    """
+    回傳 EG.EAGLE_get_library_info() 的結果，成功的回應會快取 ``_LIBRARY_INFO_TTL`` 秒。
+    回傳的 dict 由所有呼叫端共用，請勿修改。
+    """
+    now = time.monotonic()
+    with _LIBRARY_INFO_LOCK:
+        if _LIBRARY_INFO_CACHE["value"] is not None and now < _LIBRARY_INFO_CACHE["expires"]:
+            return _LIBRARY_INFO_CACHE["value"]
+
+    response = EG.EAGLE_get_library_info()
+    if response.get("status") == "success":
+        with _LIBRARY_INFO_LOCK:
+            _LIBRARY_INFO_CACHE.update({"expires": now + _LIBRARY_INFO_TTL, "value": response})
+    return response
+
+
+def _cached_library_path():
+    """
+    由快取的 library info 取出資源庫路徑，錯誤行為與 EG.EAGLE_get_current_library_path() 相同。
+    """
+    response = _cached_library_info()
+    if response.get("status") != "success":
+        raise ValueError(f"Failed to fetch library info: {response.get('data')}")
+    library_path = response.get("data", {}).get("library", {}).get("path")
+    if not library_path:
+        raise ValueError("Library path not found in response.")
+    return library_path
+
+
 def get_eagle_folders():
     """
     獲取 Eagle API 提供的所有資料夾資訊
     """
-    response = EG.EAGLE_get_library_info()
+    response = _cached_library_info()
     if response.get("status") != "success":
         raise ExternalServiceError(f"Failed to fetch Eagle folders: {response.get('data')}")
 
@@ -51,18 +86,24 @@ def get_eagle_folders():
         tags=["eagle", "folders"],
         path="/EAGLE_folder",
         thumbnail_route=DEFAULT_THUMBNAIL_ROUTE,
-        filesystem_path=EG.EAGLE_get_current_library_path()
+        filesystem_path=_cached_library_path()
     )
 
+    folders = response.get("data", {}).get("folders", [])
+    buckets = _list_items_by_folder([folder.get("id") for folder in folders])
+    base = _cached_library_path()
+
     data: list[MediaEntry] = []
-    for folder in response.get("data", {}).get("folders", []):
+    for folder in folders:
         folder_id = folder.get("id")
         folder_name = folder.get("name", "Unnamed Folder")
 
-        folder_response = EG.EAGLE_list_items(folders=[folder_id])
-        image_items = folder_response.get("data", [])
-        image_items.sort(key=lambda x: x.get("name", ""))
-        thumbnail_path = f"/serve_image/{EG.EAGLE_get_current_library_path()}/images/{image_items[0]['id']}.info/{image_items[0]['name']}.{image_items[0]['ext']}" if image_items else DEFAULT_THUMBNAIL_ROUTE
+        image_items = buckets.get(folder_id)
+        if image_items:
+            first = min(image_items, key=lambda x: x.get("name", ""))
+            thumbnail_path = f"/serve_image/{base}/images/{first['id']}.info/{first['name']}.{first['ext']}"
+        else:
+            thumbnail_path = DEFAULT_THUMBNAIL_ROUTE
 
         data.append(MediaEntry(
             name=folder_name,
@@ -85,23 +126,20 @@ def get_eagle_images_by_folderid(eagle_folder_id):
         raise ExternalServiceError(f"Failed to fetch images from Eagle folder: {response.get('data')}")
 
     folder_links = []
-    current_folder, parent_folder = _get_eagle_folder_context(eagle_folder_id)
+    parent_map = _cached_folder_parent_map()
+    current_folder, parent = parent_map.get(eagle_folder_id, (None, None))
     if current_folder:
         path_stack = []
-        node = current_folder
-        parent = parent_folder
         while parent:
             parent_id = parent.get("id")
-            if parent_id:
-                path_stack.append({
-                    "id": parent_id,
-                    "name": parent.get("name", parent_id),
-                    "url": f"/EAGLE_folder/{parent_id}/"
-                })
-                grand = _get_eagle_folder_context(parent_id)[1]
-                parent = grand
-            else:
+            if not parent_id:
                 break
+            path_stack.append({
+                "id": parent_id,
+                "name": parent.get("name", parent_id),
+                "url": f"/EAGLE_folder/{parent_id}/"
+            })
+            parent = parent_map.get(parent_id, (None, None))[1]
         folder_links = list(reversed(path_stack))
 
     folder_name = current_folder.get("name") if current_folder else eagle_folder_id
@@ -116,7 +154,7 @@ def get_eagle_images_by_folderid(eagle_folder_id):
         folders=folder_links
     )
     image_items = response.get("data", [])
-    data = _format_eagle_items(image_items)
+    data = _format_eagle_items(image_items, sort_by_name=True)
     return metadata, data
 
 
@@ -212,7 +250,7 @@ def search_eagle_items(keyword, limit=120):
         tags=[keyword],
         path=f"/search?query={keyword}",
         thumbnail_route=DEFAULT_THUMBNAIL_ROUTE,
-        filesystem_path=EG.EAGLE_get_current_library_path()
+        filesystem_path=_cached_library_path()
     )
 
     return metadata, data
@@ -241,7 +279,11 @@ def _extract_folder_ids(raw_folders):
     if not raw_folders:
         return []
 
-    ids = OrderedDict()
+    # 常見情況：Eagle 直接回傳 id 字串 list，一次 strip + 去重
+    if isinstance(raw_folders, (list, tuple)) and all(isinstance(entry, str) for entry in raw_folders):
+        return [folder_id for folder_id in dict.fromkeys(map(str.strip, raw_folders)) if folder_id]
+
+    ids = {}
 
     if not isinstance(raw_folders, (list, tuple, set)):
         raw_folders = [raw_folders]
@@ -261,7 +303,43 @@ def _extract_folder_ids(raw_folders):
             if folder_id:
                 ids.setdefault(folder_id, None)
 
-    return list(ids.keys())
+    return list(ids)
+
+
+_FOLDER_NAME_TTL = 60.0
+_FOLDER_NAME_CACHE = {"expires": 0.0, "value": None}
+_FOLDER_NAME_LOCK = threading.Lock()
+
+
+def _folder_name_lookup():
+    """
+    回傳 {folder_id: folder_name}（含所有子資料夾），成功取得時快取 ``_FOLDER_NAME_TTL`` 秒。
+    直接走訪 folder/list 的原始 JSON，不經過 DataFrame。
+    """
+    now = time.monotonic()
+    with _FOLDER_NAME_LOCK:
+        if _FOLDER_NAME_CACHE["value"] is not None and now < _FOLDER_NAME_CACHE["expires"]:
+            return _FOLDER_NAME_CACHE["value"]
+
+    try:
+        response = EG.EAGLE_get_folders()
+    except Exception:
+        return {}
+    if response.get("status") != "success":
+        return {}
+
+    lookup = {}
+    stack = list(reversed(response.get("data") or []))
+    while stack:
+        node = stack.pop()
+        node_id = str(node.get("id") or "").strip()
+        if node_id:
+            lookup[node_id] = node.get("name") or node_id
+        stack.extend(reversed(node.get("children") or []))
+
+    with _FOLDER_NAME_LOCK:
+        _FOLDER_NAME_CACHE.update({"expires": now + _FOLDER_NAME_TTL, "value": lookup})
+    return lookup
 
 
 def _build_eagle_folder_links(folder_ids):
@@ -272,25 +350,14 @@ def _build_eagle_folder_links(folder_ids):
     if not folder_ids:
         return []
 
-    try:
-        df = EG.EAGLE_get_folders_df_all(flatten=True)
-    except Exception:
-        df = None
-
-    lookup = {}
-    if df is not None and getattr(df, "empty", True) is False:
-        for _, row in df.iterrows():
-            row_id = str(row.get("id") or "").strip()
-            if not row_id:
-                continue
-            lookup[row_id] = row.get("name") or row_id
+    lookup = _folder_name_lookup()
 
     links = []
-    seen = OrderedDict()
+    seen = set()
     for folder_id in folder_ids:
         if folder_id in seen:
             continue
-        seen[folder_id] = None
+        seen.add(folder_id)
         folder_name = lookup.get(folder_id, folder_id)
         links.append({
             "id": folder_id,
@@ -309,7 +376,10 @@ def _normalize_item_tags(raw_tags):
     if not raw_tags:
         return []
 
-    tags = OrderedDict()
+    if isinstance(raw_tags, (list, tuple)) and all(isinstance(entry, str) for entry in raw_tags):
+        return [tag for tag in dict.fromkeys(map(str.strip, raw_tags)) if tag]
+
+    tags = {}
     if isinstance(raw_tags, str):
         raw_tags = [raw_tags]
 
@@ -324,40 +394,101 @@ def _normalize_item_tags(raw_tags):
             if normalized:
                 tags.setdefault(normalized, None)
 
-    return list(tags.keys())
+    return list(tags)
 
 
-def _get_eagle_folder_context(folder_id):
+_FOLDER_BATCH_ITEMS_PER_FOLDER = 20
+
+
+def _list_items_by_folder(folder_ids):
     """
-    取得指定 Eagle 資料夾及其父資料夾資訊。
-    Returns (current_folder, parent_folder)
+    以單一 list_items 請求取回多個資料夾的項目，並依 item 的 folders 欄位分桶。
+    Returns {folder_id: [raw_item, ...]}，保留 API 回傳順序。
+
+    批次結果被 limit 截斷時，空桶的資料夾才會個別補查一次。
     """
-    response = EG.EAGLE_get_library_info()
+    folder_ids = [folder_id for folder_id in folder_ids if folder_id]
+    if not folder_ids:
+        return {}
+
+    wanted = set(folder_ids)
+    buckets = {folder_id: [] for folder_id in folder_ids}
+    limit = len(folder_ids) * _FOLDER_BATCH_ITEMS_PER_FOLDER
+    response = EG.EAGLE_list_items(folders=folder_ids, limit=limit)
+    batch_ok = response.get("status") == "success"
+    items = (response.get("data") or []) if batch_ok else []
+    for item in items:
+        for folder_id in item.get("folders") or ():
+            if folder_id in wanted:
+                buckets[folder_id].append(item)
+
+    # 回傳數量少於 limit 代表結果完整，空桶就是真的空資料夾，不必再補查
+    if batch_ok and len(items) < limit:
+        return buckets
+
+    for folder_id in folder_ids:
+        if buckets[folder_id]:
+            continue
+        fallback = EG.EAGLE_list_items(folders=[folder_id])
+        if fallback.get("status") == "success":
+            buckets[folder_id] = fallback.get("data") or []
+    return buckets
+
+
+def _build_folder_parent_map(folders):
+    """
+    以迭代 DFS 走訪資料夾樹，回傳 {folder_id: (node, parent_node)}。
+    重複的 id 以先序走訪中第一次出現者為準。
+    """
+    parent_map = {}
+    stack = [(node, None) for node in reversed(folders or [])]
+    while stack:
+        node, parent = stack.pop()
+        node_id = node.get("id")
+        if node_id is not None:
+            parent_map.setdefault(node_id, (node, parent))
+        for child in reversed(node.get("children") or []):
+            stack.append((child, node))
+    return parent_map
+
+
+_FOLDER_PARENT_MAP_CACHE = {"source": None, "map": {}}
+
+
+def _cached_folder_parent_map():
+    """
+    回傳目前 library info 對應的 parent map；library info 快取更新時才重建。
+    """
+    response = _cached_library_info()
     if response.get("status") != "success":
-        return None, None
+        return {}
+    cached = _FOLDER_PARENT_MAP_CACHE
+    if cached["source"] is response:
+        return cached["map"]
+    parent_map = _build_folder_parent_map(response.get("data", {}).get("folders", []))
+    _FOLDER_PARENT_MAP_CACHE.update({"source": response, "map": parent_map})
+    return parent_map
 
-    folders = response.get("data", {}).get("folders", [])
 
-    def _search(nodes, parent=None):
-        for node in nodes:
-            if node.get("id") == folder_id:
-                return node, parent
-            result = _search(node.get("children", []), node)
-            if result is not None:
-                return result
-        return None
+_SIMILAR_QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="eagle-similar")
 
-    found = _search(folders)
-    if not found:
-        return None, None
-    return found
+
+def _safe_list_items(filters, limit):
+    """呼叫 EG.EAGLE_list_items，例外時回傳 None 讓呼叫端略過。"""
+    try:
+        return EG.EAGLE_list_items(limit=limit, orderBy="MODIFIEDDATE", **filters)
+    except Exception:
+        return None
 
 
 def _build_eagle_similar_items(current_item_id, tags, folder_ids, limit=6):
     """
     根據標籤或資料夾推薦相似項目。
     """
-    candidate_map = OrderedDict()
+    if not tags and not folder_ids:
+        return []
+
+    candidate_map = {}
 
     def _accumulate_from_response(response):
         if response.get("status") != "success":
@@ -370,27 +501,24 @@ def _build_eagle_similar_items(current_item_id, tags, folder_ids, limit=6):
                 continue
             candidate_map[other_id] = raw
 
-    primary_tags = tags[:2] if tags else []
-    for tag in primary_tags:
-        try:
-            resp = EG.EAGLE_list_items(tags=[tag], limit=120, orderBy="MODIFIEDDATE")
-        except Exception:
-            continue
-        _accumulate_from_response(resp)
-        if len(candidate_map) >= limit * 2:
-            break
+    query_limit = max(limit * 3, 20)
 
-    if not candidate_map and folder_ids:
-        primary_folders = folder_ids[:2]
-        for folder_id in primary_folders:
-            try:
-                resp = EG.EAGLE_list_items(folders=[folder_id], limit=120, orderBy="MODIFIEDDATE")
-            except Exception:
+    def _run_queries(query_specs):
+        # 各查詢彼此獨立，平行送出後仍依原順序累積，結果與逐一查詢一致
+        for resp in _SIMILAR_QUERY_EXECUTOR.map(lambda spec: _safe_list_items(spec, query_limit), query_specs):
+            if resp is None:
                 continue
             _accumulate_from_response(resp)
             if len(candidate_map) >= limit * 2:
                 break
 
+    primary_tags = tags[:2] if tags else []
+    _run_queries([{"tags": [tag]} for tag in primary_tags])
+
+    if not candidate_map and folder_ids:
+        primary_folders = folder_ids[:2]
+        _run_queries([{"folders": [folder_id]} for folder_id in primary_folders])
+
     if not candidate_map:
         return []
 
@@ -424,6 +552,105 @@ def _build_eagle_similar_items(current_item_id, tags, folder_ids, limit=6):
     return similar_items
 
 
+# Eagle 自己產生的影片縮圖是 PNG，放第一個；固定順序也讓多張縮圖並存時結果可預期
+_THUMBNAIL_EXT_ORDER = ("png",) + tuple(sorted(IMAGE_EXTENSIONS - {"png"}))
+
+
+# item_id -> 到期時間；詳細頁確認某影片沒有縮圖後，列表頁在期限內直接用預設縮圖，不再產生必定 404 的路徑
+_MISSING_VIDEO_THUMBNAILS = {}
+_MISSING_VIDEO_THUMBNAILS_TTL = 300.0
+_MISSING_VIDEO_THUMBNAILS_MAX = 4096
+_MISSING_VIDEO_THUMBNAILS_LOCK = threading.Lock()
+
+
+def _record_video_thumbnail(item_id, found):
+    with _MISSING_VIDEO_THUMBNAILS_LOCK:
+        _MISSING_VIDEO_THUMBNAILS.pop(item_id, None)
+        if found:
+            return
+        _MISSING_VIDEO_THUMBNAILS[item_id] = time.monotonic() + _MISSING_VIDEO_THUMBNAILS_TTL
+        while len(_MISSING_VIDEO_THUMBNAILS) > _MISSING_VIDEO_THUMBNAILS_MAX:
+            del _MISSING_VIDEO_THUMBNAILS[next(iter(_MISSING_VIDEO_THUMBNAILS))]
+
+
+def _file_ext(name):
+    return os.path.splitext(name)[1].lstrip(".").lower()
+
+
+def _scan_item_dir(item_dir):
+    """
+    以單次 os.scandir 讀取 item 目錄，回傳 {name: DirEntry}（保留目錄順序）；目錄不存在時回傳空 dict。
+    """
+    try:
+        with os.scandir(item_dir) as it:
+            return {entry.name: entry for entry in it}
+    except OSError:
+        return {}
+
+
+class _ProbedFile:
+    """isfile 探測命中的檔案，提供呼叫端會用到的 DirEntry 介面（name / path / stat）。"""
+
+    __slots__ = ("name", "path")
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+
+    def stat(self):
+        return os.stat(self.path)
+
+
+def _find_candidate_file(item_dir, entries, candidate_names):
+    """
+    依序比對候選檔名，回傳第一個存在的一般檔案；找不到時回傳 None。
+    候選檔名不在 ``entries`` 中時（大小寫或 Unicode 正規化不同的檔案系統、目錄無法列舉），
+    再以 os.path.isfile 探測一次。
+    """
+    for name in candidate_names:
+        if not name:
+            continue
+        entry = entries.get(name)
+        if entry is None:
+            candidate_path = os.path.join(item_dir, name)
+            if os.path.isfile(candidate_path):
+                return _ProbedFile(candidate_path)
+            continue
+        if entry.is_file():
+            return entry
+    return None
+
+
+def _locate_media_file(item_dir, entries, candidate_names, valid_exts, check_candidate_ext=False):
+    """
+    先以 _find_candidate_file 依序比對候選檔名，找不到時再依目錄順序找第一個副檔名屬於 ``valid_exts`` 的檔案。
+    ``check_candidate_ext`` 為 True 時，候選檔名本身也必須符合 ``valid_exts``。
+    回傳找到的 DirEntry（其 stat() 結果會被快取），找不到時回傳 None。
+    """
+    if check_candidate_ext:
+        candidate_names = [name for name in candidate_names if name and _file_ext(name) in valid_exts]
+    entry = _find_candidate_file(item_dir, entries, candidate_names)
+    if entry is not None:
+        return entry
+
+    for name, entry in entries.items():
+        if _file_ext(name) in valid_exts and entry.is_file():
+            return entry
+    return None
+
+
+def _item_tags_and_folders(item):
+    """
+    取出 Eagle item 的標籤與資料夾 id（資料夾缺少時改用 folderId / folder_id）。
+    """
+    tags = _normalize_item_tags(item.get("tags"))
+    folder_ids = _extract_folder_ids(item.get("folders"))
+    fallback_folder = item.get("folderId") or item.get("folder_id")
+    if not folder_ids and fallback_folder:
+        folder_ids = _extract_folder_ids([fallback_folder])
+    return tags, folder_ids
+
+
 def get_eagle_video_details(item_id):
     """
     從 Eagle API 取得單一影片項目的詳細資訊並組合成播放器頁面需要的結構。
@@ -448,7 +675,9 @@ def get_eagle_video_details(item_id):
     if ext not in VIDEO_EXTENSIONS:
         raise MediaNotFound("Requested Eagle item is not a video.")
 
-    base_library_path = EG.EAGLE_get_current_library_path()
+    tags, folder_ids = _item_tags_and_folders(item)
+
+    base_library_path = _cached_library_path()
     item_dir = os.path.join(base_library_path, "images", f"{item_id}.info")
 
     candidate_files = []
@@ -458,48 +687,33 @@ def get_eagle_video_details(item_id):
         candidate_files.append(file_name_with_ext)
     candidate_files.append(f"{item_id}.{ext}")
 
-    video_path = None
-    for candidate in candidate_files:
-        candidate_path = os.path.join(item_dir, candidate)
-        if os.path.isfile(candidate_path):
-            video_path = candidate_path
-            break
-
-    if video_path is None and os.path.isdir(item_dir):
-        for entry in os.listdir(item_dir):
-            if _is_video_file(entry):
-                video_path = os.path.join(item_dir, entry)
-                file_name, ext = os.path.splitext(entry)
-                ext = ext.lstrip(".").lower()
-                break
-
-    if video_path is None:
+    entries = _scan_item_dir(item_dir)
+    video_entry = _locate_media_file(item_dir, entries, candidate_files, VIDEO_EXTENSIONS)
+    if video_entry is None:
         raise MediaNotFound("Video file not found on disk.")
+    video_name = video_entry.name
+    if video_name not in candidate_files:
+        ext = _file_ext(video_name)
 
+    video_path = video_entry.path
+    video_stat = video_entry.stat()
     normalized_abs_path = _normalize_slashes(os.path.abspath(video_path))
     relative_path = _normalize_slashes(os.path.relpath(video_path, base_library_path))
-    file_size = os.path.getsize(video_path)
-    modified_time = datetime.fromtimestamp(os.path.getmtime(video_path))
+    file_size = video_stat.st_size
+    modified_time = datetime.fromtimestamp(video_stat.st_mtime)
 
     stream_route = f"/serve_image/{normalized_abs_path}"
 
     thumbnail_route = DEFAULT_VIDEO_THUMBNAIL_ROUTE
-    if os.path.isdir(item_dir):
-        stem = os.path.splitext(os.path.basename(video_path))[0]
-        for image_ext in IMAGE_EXTENSIONS:
-            candidate_thumb = os.path.join(item_dir, f"{stem}_thumbnail.{image_ext}")
-            if os.path.isfile(candidate_thumb):
-                thumbnail_route = f"/serve_image/{_normalize_slashes(os.path.abspath(candidate_thumb))}"
-                break
-
-    tags = item.get("tags") or []
-    tags = _normalize_item_tags(tags)
+    stem = os.path.splitext(video_name)[0]
+    thumb_entry = _find_candidate_file(
+        item_dir, entries, [f"{stem}_thumbnail.{image_ext}" for image_ext in _THUMBNAIL_EXT_ORDER]
+    )
+    if thumb_entry is not None:
+        thumbnail_route = f"/serve_image/{_normalize_slashes(os.path.abspath(thumb_entry.path))}"
+    _record_video_thumbnail(item_id, found=thumbnail_route != DEFAULT_VIDEO_THUMBNAIL_ROUTE)
 
     original_url = item.get("website") or item.get("url")
-    folder_ids = _extract_folder_ids(item.get("folders"))
-    fallback_folder = item.get("folderId") or item.get("folder_id")
-    if not folder_ids and fallback_folder:
-        folder_ids = _extract_folder_ids([fallback_folder])
     folder_links = _build_eagle_folder_links(folder_ids)
     similar_items = _build_eagle_similar_items(item_id, tags, folder_ids)
     resolved_ext = ext or os.path.splitext(video_path)[1].lstrip(".").lower() or None
@@ -513,7 +727,7 @@ def get_eagle_video_details(item_id):
         filesystem_path=normalized_abs_path,
         description=item.get("annotation") or item.get("note"),
         folders=folder_links,
-        similar=[entry.to_dict() for entry in similar_items],
+        similar=similar_items,
         ext=resolved_ext
     )
 
@@ -523,7 +737,7 @@ def get_eagle_video_details(item_id):
         source_url=stream_route,
         original_url=original_url,
         thumbnail_route=thumbnail_route,
-        mime_type=mimetypes.guess_type(video_path)[0] or "video/mp4",
+        mime_type=_mime_for_ext(_file_ext(video_path)) or "video/mp4",
         size_bytes=file_size,
         size_display=_human_readable_size(file_size),
         modified_time=modified_time.strftime("%Y-%m-%d %H:%M"),
@@ -553,7 +767,9 @@ def get_eagle_image_details(item_id):
     file_name = item.get("name") or item_id
     file_name_with_ext = item.get("fileName")
 
-    base_library_path = EG.EAGLE_get_current_library_path()
+    tags, folder_ids = _item_tags_and_folders(item)
+
+    base_library_path = _cached_library_path()
     item_dir = os.path.join(base_library_path, "images", f"{item_id}.info")
 
     candidate_files = []
@@ -563,42 +779,22 @@ def get_eagle_image_details(item_id):
         candidate_files.append(f"{file_name}.{ext}" if ext else file_name)
     candidate_files.append(f"{item_id}.{ext}" if ext else item_id)
 
-    image_path = None
-    resolved_ext = ext
-    for candidate in candidate_files:
-        if not candidate:
-            continue
-        candidate_path = os.path.join(item_dir, candidate)
-        if os.path.isfile(candidate_path):
-            resolved_ext = os.path.splitext(candidate)[1].lstrip(".").lower()
-            if resolved_ext in IMAGE_EXTENSIONS:
-                image_path = candidate_path
-                break
-
-    if image_path is None and os.path.isdir(item_dir):
-        for entry in os.listdir(item_dir):
-            entry_ext = os.path.splitext(entry)[1].lstrip(".").lower()
-            if entry_ext in IMAGE_EXTENSIONS:
-                image_path = os.path.join(item_dir, entry)
-                resolved_ext = entry_ext
-                break
-
-    if image_path is None:
+    entries = _scan_item_dir(item_dir)
+    image_entry = _locate_media_file(item_dir, entries, candidate_files, IMAGE_EXTENSIONS, check_candidate_ext=True)
+    if image_entry is None:
         raise MediaNotFound("Image file not found on disk.")
+    resolved_ext = _file_ext(image_entry.name)
 
+    image_path = image_entry.path
+    image_stat = image_entry.stat()
     normalized_abs_path = _normalize_slashes(os.path.abspath(image_path))
     relative_path = _normalize_slashes(os.path.relpath(image_path, base_library_path))
-    file_size = os.path.getsize(image_path)
-    modified_time = datetime.fromtimestamp(os.path.getmtime(image_path))
+    file_size = image_stat.st_size
+    modified_time = datetime.fromtimestamp(image_stat.st_mtime)
 
     stream_route = f"/serve_image/{normalized_abs_path}"
 
-    tags = _normalize_item_tags(item.get("tags"))
     original_url = item.get("website") or item.get("url")
-    folder_ids = _extract_folder_ids(item.get("folders"))
-    fallback_folder = item.get("folderId") or item.get("folder_id")
-    if not folder_ids and fallback_folder:
-        folder_ids = _extract_folder_ids([fallback_folder])
     folder_links = _build_eagle_folder_links(folder_ids)
     similar_items = _build_eagle_similar_items(item_id, tags, folder_ids)
 
@@ -611,7 +807,7 @@ def get_eagle_image_details(item_id):
         filesystem_path=normalized_abs_path,
         description=item.get("annotation") or item.get("note"),
         folders=folder_links,
-        similar=[entry.to_dict() for entry in similar_items],
+        similar=similar_items,
         ext=resolved_ext or None
     )
 
@@ -621,7 +817,7 @@ def get_eagle_image_details(item_id):
         source_url=stream_route,
         original_url=original_url,
         thumbnail_route=stream_route,
-        mime_type=mimetypes.guess_type(image_path)[0] or f"image/{resolved_ext or 'jpeg'}",
+        mime_type=_mime_for_ext(resolved_ext) or f"image/{resolved_ext or 'jpeg'}",
         size_bytes=file_size,
         size_display=_human_readable_size(file_size),
         modified_time=modified_time.strftime("%Y-%m-%d %H:%M"),
@@ -634,33 +830,50 @@ def get_eagle_image_details(item_id):
     return metadata, image_data
 
 
-def _format_eagle_items(image_items):
+def _format_eagle_items(image_items, sort_by_name=False):
     """
     將 Eagle 圖片清單格式化成 EAGLE API 樣式的 data list。
+    預設保留 API 回傳的順序（例如 orderBy="CREATEDATE"）；sort_by_name=True 時改依名稱排序。
     """
-    image_items.sort(key=lambda x: x.get("name", ""))
+    if sort_by_name:
+        image_items.sort(key=lambda x: x.get("name", ""))
     data: list[MediaEntry] = []
 
-    base = EG.EAGLE_get_current_library_path()
+    base = _cached_library_path()
+    route_root = f"/serve_image/{base}/images"
+    # 只對 library 路徑做一次 abspath；id 與檔名不含路徑分隔符，逐項 abspath 只是重複正規化
+    # 逐項再以 os.sep 串接，結果與 os.path.join 相同
+    item_root = os.path.join(os.path.abspath(base), "images", "")
+    sep = os.sep
+    video_exts = VIDEO_EXTENSIONS
+    append = data.append
+    missing_thumbs = _MISSING_VIDEO_THUMBNAILS
+    now = time.monotonic()
     for image in image_items:
         image_id = image.get("id")
         image_name = image.get("name", "unknown")
         image_ext = image.get("ext", "jpg")
-        image_path = f"/serve_image/{base}/images/{image_id}.info/{image_name}.{image_ext}"
+        info_dir = f"{image_id}.info"
+        file_name = f"{image_name}.{image_ext}"
+        info_route = f"{route_root}/{info_dir}"
+        image_path = f"{info_route}/{file_name}"
 
         normalized_ext = (image_ext or "").lower()
-        is_video = normalized_ext in VIDEO_EXTENSIONS
+        is_video = normalized_ext in video_exts
         if normalized_ext == "mp4":
-            thumbnail_route = f"/serve_image/{base}/images/{image_id}.info/{image_name}_thumbnail.png"
+            if missing_thumbs.get(image_id, 0.0) > now:
+                thumbnail_route = DEFAULT_VIDEO_THUMBNAIL_ROUTE
+            else:
+                thumbnail_route = f"{info_route}/{image_name}_thumbnail.png"
         else:
             thumbnail_route = image_path
 
-        data.append(MediaEntry(
+        append(MediaEntry(
             id=image_id,
             name=image_name,
             url=image_path,
             thumbnail_route=thumbnail_route,
-            item_path=os.path.abspath(os.path.join(base, "images", f"{image_id}.info", f"{image_name}.{image_ext}")),
+            item_path=f"{item_root}{info_dir}{sep}{file_name}",
             media_type="video" if is_video else "image",
             ext=normalized_ext or None
         ))
@@ -680,6 +893,8 @@ def get_subfolders_info(folder_id):
         return []
 
     children_infos = row.iloc[0]["children"]
+    buckets = _list_items_by_folder([child_info["id"] for child_info in children_infos])
+    base = _cached_library_path() if any(buckets.values()) else None
     result = []
 
     for child_info in children_infos:
@@ -687,14 +902,13 @@ def get_subfolders_info(folder_id):
         sub_name = child_info.get("name", f"(unnamed-{child_id})")
         path = f"/EAGLE_folder/{child_id}"
 
-        folder_response = EG.EAGLE_list_items(folders=[child_id])
         thumbnail_route = DEFAULT_THUMBNAIL_ROUTE
-        if folder_response.get("status") == "success" and folder_response.get("data"):
-            first_img = folder_response["data"][0]
+        child_items = buckets.get(child_id)
+        if child_items:
+            first_img = child_items[0]
             image_id = first_img["id"]
             image_name = first_img["name"]
             image_ext = first_img["ext"]
-            base = EG.EAGLE_get_current_library_path()
             thumbnail_route = f"/serve_image/{base}/images/{image_id}.info/{image_name}.{image_ext}"
 
         result.append(MediaEntry(
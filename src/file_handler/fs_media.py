@@ -1,8 +1,8 @@
 """Local filesystem media handling for Flowinone."""
 
-import mimetypes
 import os
 import random
+import stat
 from datetime import datetime
 
 from config import DB_route_internal, DB_route_external
@@ -16,6 +16,8 @@ from .models import (
 )
 from .paths import (
     DEFAULT_THUMBNAIL_ROUTE,
+    IMAGE_EXTENSIONS,
+    VIDEO_EXTENSIONS,
     _build_file_route,
     _build_folder_url,
     _build_image_url,
@@ -26,42 +28,45 @@ from .paths import (
     _human_readable_size,
     _is_image_file,
     _is_video_file,
+    _mime_for_ext,
     _normalize_slashes,
     _normalize_source,
     _safe_relative_path,
 )
 
 
-def _build_folder_entry(display_name, abs_path, rel_path, src):
+def _build_folder_entry(display_name, abs_path, rel_path, src, item_path=None):
     return MediaEntry(
         name=display_name,
         thumbnail_route=_find_directory_thumbnail(abs_path, src),
         url=_build_folder_url(rel_path, src),
-        item_path=os.path.abspath(abs_path),
+        item_path=item_path or os.path.abspath(abs_path),
         media_type="folder",
     )
 
 
-def _build_image_entry(display_name, abs_path, rel_path, src):
+def _build_image_entry(display_name, abs_path, rel_path, src, item_path=None):
     file_route = _build_file_route(abs_path, src)
-    ext = os.path.splitext(display_name)[1].lstrip(".").lower()
+    _, dot, ext = display_name.rpartition(".")
+    ext = ext.lower() if dot else ""
     return MediaEntry(
         name=display_name,
         thumbnail_route=file_route,
         url=_build_image_url(rel_path, src),
-        item_path=os.path.abspath(abs_path),
+        item_path=item_path or os.path.abspath(abs_path),
         media_type="image",
         ext=ext or None,
     )
 
 
-def _build_video_entry(display_name, abs_path, rel_path, src):
-    ext = os.path.splitext(display_name)[1].lstrip(".").lower()
+def _build_video_entry(display_name, abs_path, rel_path, src, item_path=None, sibling_names=None):
+    _, dot, ext = display_name.rpartition(".")
+    ext = ext.lower() if dot else ""
     return MediaEntry(
         name=display_name,
-        thumbnail_route=_find_video_thumbnail(abs_path, src),
+        thumbnail_route=_find_video_thumbnail(abs_path, src, sibling_names),
         url=_build_video_url(rel_path, src),
-        item_path=os.path.abspath(abs_path),
+        item_path=item_path or os.path.abspath(abs_path),
         media_type="video",
         ext=ext or None,
     )
@@ -135,6 +140,20 @@ def get_folder_images(folder_path, src=None):
     return metadata, data
 
 
+def _parent_folder_link(safe_path, base_dir, src):
+    """
+    詳細頁的上層資料夾連結，回傳 (parent_url, folder_links)；位於根目錄時以根資料夾名稱顯示。
+    """
+    parent_relative = _normalize_slashes(os.path.dirname(safe_path))
+    if parent_relative:
+        parent_url = _build_folder_url(parent_relative, src)
+        name = os.path.basename(parent_relative) or parent_relative
+    else:
+        parent_url = "/" if src == "external" else "/?src=internal"
+        name = os.path.basename(os.path.normpath(base_dir)) or "Root"
+    return parent_url, [{"name": name, "url": parent_url}]
+
+
 def get_video_details(video_path, src=None):
     """
     取得影片詳細資訊與播放所需路徑。
@@ -144,34 +163,28 @@ def get_video_details(video_path, src=None):
     base_dir = DB_route_external if normalized_src == "external" else DB_route_internal
     target_path = os.path.join(base_dir, safe_video_path) if safe_video_path else base_dir
 
-    if not os.path.isfile(target_path) or not _is_video_file(target_path):
+    if not _is_video_file(target_path):
+        raise MediaNotFound(target_path)
+    # 一次 stat 同時取得檔案型別、大小與修改時間
+    try:
+        file_stat = os.stat(target_path)
+    except OSError:
+        raise MediaNotFound(target_path)
+    if not stat.S_ISREG(file_stat.st_mode):
         raise MediaNotFound(target_path)
 
     file_name = os.path.basename(safe_video_path) if safe_video_path else os.path.basename(target_path)
-    file_ext = os.path.splitext(file_name)[1].lstrip(".").lower()
-    file_size = os.path.getsize(target_path)
-    modified_time = datetime.fromtimestamp(os.path.getmtime(target_path))
-    thumbnail_route = _find_video_thumbnail(target_path, normalized_src)
+    _, dot, file_ext = file_name.rpartition(".")
+    file_ext = file_ext.lower() if dot else ""
+    file_size = file_stat.st_size
+    modified_time = datetime.fromtimestamp(file_stat.st_mtime)
+    # 相似項目掃描同資料夾時已記下圖片檔名，縮圖直接查表，不必再列一次
+    similar_items, image_names = _collect_local_similar_items(target_path, base_dir, normalized_src, limit=6)
+    thumbnail_route = _find_video_thumbnail(target_path, normalized_src, image_names)
     source_url = _build_file_route(target_path, normalized_src)
-    mime_type = mimetypes.guess_type(file_name)[0] or "video/mp4"
-
-    parent_relative = _normalize_slashes(os.path.dirname(safe_video_path))
-    parent_url = _build_folder_url(parent_relative, normalized_src) if parent_relative else ("/" if normalized_src == "external" else "/?src=internal")
+    mime_type = _mime_for_ext(file_ext) or "video/mp4"
 
-    folder_links = []
-    if parent_relative:
-        folder_links.append({
-            "name": os.path.basename(parent_relative) or parent_relative,
-            "url": parent_url
-        })
-    else:
-        root_name = os.path.basename(os.path.normpath(DB_route_external if normalized_src == "external" else DB_route_internal)) or "Root"
-        folder_links.append({
-            "name": root_name,
-            "url": parent_url
-        })
-
-    similar_items = _build_local_similar_items(target_path, base_dir, normalized_src, limit=6)
+    parent_url, folder_links = _parent_folder_link(safe_video_path, base_dir, normalized_src)
 
     metadata = PageMetadata(
         name=file_name,
@@ -181,7 +194,7 @@ def get_video_details(video_path, src=None):
         thumbnail_route=thumbnail_route,
         filesystem_path=os.path.abspath(os.path.dirname(target_path)),
         folders=folder_links,
-        similar=[item.to_dict() for item in similar_items],
+        similar=similar_items,
         ext=file_ext or None
     )
 
@@ -213,31 +226,25 @@ def get_image_details(image_path, src=None):
     base_dir = DB_route_external if normalized_src == "external" else DB_route_internal
     target_path = os.path.join(base_dir, safe_image_path) if safe_image_path else base_dir
 
-    if not os.path.isfile(target_path) or not _is_image_file(target_path):
+    if not _is_image_file(target_path):
+        raise MediaNotFound(target_path)
+    # 一次 stat 同時取得檔案型別、大小與修改時間
+    try:
+        file_stat = os.stat(target_path)
+    except OSError:
+        raise MediaNotFound(target_path)
+    if not stat.S_ISREG(file_stat.st_mode):
         raise MediaNotFound(target_path)
 
     file_name = os.path.basename(safe_image_path) if safe_image_path else os.path.basename(target_path)
-    file_ext = os.path.splitext(file_name)[1].lstrip(".").lower()
-    file_size = os.path.getsize(target_path)
-    modified_time = datetime.fromtimestamp(os.path.getmtime(target_path))
+    _, dot, file_ext = file_name.rpartition(".")
+    file_ext = file_ext.lower() if dot else ""
+    file_size = file_stat.st_size
+    modified_time = datetime.fromtimestamp(file_stat.st_mtime)
     source_url = _build_file_route(target_path, normalized_src)
-    mime_type = mimetypes.guess_type(file_name)[0] or "image/jpeg"
-
-    parent_relative = _normalize_slashes(os.path.dirname(safe_image_path))
-    parent_url = _build_folder_url(parent_relative, normalized_src) if parent_relative else ("/" if normalized_src == "external" else "/?src=internal")
+    mime_type = _mime_for_ext(file_ext) or "image/jpeg"
 
-    folder_links = []
-    if parent_relative:
-        folder_links.append({
-            "name": os.path.basename(parent_relative) or parent_relative,
-            "url": parent_url
-        })
-    else:
-        root_name = os.path.basename(os.path.normpath(DB_route_external if normalized_src == "external" else DB_route_internal)) or "Root"
-        folder_links.append({
-            "name": root_name,
-            "url": parent_url
-        })
+    parent_url, folder_links = _parent_folder_link(safe_image_path, base_dir, normalized_src)
 
     similar_items = _build_local_similar_items(target_path, base_dir, normalized_src, limit=6)
 
@@ -249,7 +256,7 @@ def get_image_details(image_path, src=None):
         thumbnail_route=source_url,
         filesystem_path=os.path.abspath(target_path),
         folders=folder_links,
-        similar=[item.to_dict() for item in similar_items],
+        similar=similar_items,
         ext=file_ext or None
     )
 
@@ -276,55 +283,83 @@ def _build_local_similar_items(target_path, base_dir, src, limit=6):
     """
     根據同資料夾內容挑選相似的本地項目。
     """
+    return _collect_local_similar_items(target_path, base_dir, src, limit)[0]
+
+
+def _collect_local_similar_items(target_path, base_dir, src, limit=6):
+    """
+    同 _build_local_similar_items，另外回傳掃描時記下的同資料夾圖片檔名；
+    未能列舉資料夾時回傳 None，讓 _find_video_thumbnail 改用 isfile 探測。
+    """
+    if limit <= 0:
+        return [], None
     parent_dir = os.path.dirname(target_path)
+    # 同資料夾內的項目共用同一個相對路徑前綴
+    try:
+        rel_dir = _normalize_slashes(os.path.relpath(parent_dir, base_dir))
+    except ValueError:
+        return [], None
+    rel_prefix = "" if rel_dir == "." else f"{rel_dir}/"
+
+    # Algorithm R 蓄水池抽樣：邊掃描邊保留至多 limit 筆 (名稱, 路徑, 類型)，
+    # 只替最後選中的項目建立 MediaEntry（影片還要找縮圖，成本較高）
+    target_name = os.path.basename(target_path)
+    reservoir = []
+    seen = 0
+    # 影片縮圖一定是圖片副檔名，順手記下同資料夾的圖片檔名供 _find_video_thumbnail 查表
+    image_names = set()
     try:
-        entries = os.listdir(parent_dir)
+        with os.scandir(parent_dir) as it:
+            for dir_entry in it:
+                entry = dir_entry.name
+                _, dot, ext = entry.rpartition(".")
+                ext = ext.lower() if dot else ""
+                if ext in IMAGE_EXTENSIONS:
+                    media_type = "image"
+                elif ext in VIDEO_EXTENSIONS:
+                    media_type = "video"
+                else:
+                    continue
+                # DirEntry.is_file() 直接使用 readdir 的型別資訊，不必逐一 stat
+                if not dir_entry.is_file():
+                    continue
+                if media_type == "image":
+                    image_names.add(entry)
+                # 隱藏檔不列為相似項目，但仍可能是隱藏影片的縮圖，所以先記名再略過
+                if entry == target_name or entry.startswith("."):
+                    continue
+                if seen < limit:
+                    reservoir.append((entry, dir_entry.path, media_type))
+                else:
+                    slot = random.randint(0, seen)
+                    if slot < limit:
+                        reservoir[slot] = (entry, dir_entry.path, media_type)
+                seen += 1
     except (FileNotFoundError, PermissionError):
-        return []
-
-    candidates = []
-    for entry in entries:
-        if entry.startswith("."):
-            continue
-        abs_entry = os.path.join(parent_dir, entry)
-        if abs_entry == target_path or not os.path.isfile(abs_entry):
-            continue
-
-        try:
-            rel_entry = os.path.relpath(abs_entry, base_dir)
-        except ValueError:
-            continue
-        rel_entry = _normalize_slashes(rel_entry)
-
-        if _is_image_file(entry):
-            candidates.append(MediaEntry(
-                id=rel_entry,
-                name=os.path.splitext(entry)[0] or entry,
-                url=_build_image_url(rel_entry, src),
-                thumbnail_route=_build_file_route(abs_entry, src),
-                item_path=os.path.abspath(abs_entry),
-                media_type="image",
-                ext=os.path.splitext(entry)[1].lstrip(".").lower() or None
-            ))
-        elif _is_video_file(entry):
-            candidates.append(MediaEntry(
-                id=rel_entry,
-                name=os.path.splitext(entry)[0] or entry,
-                url=_build_video_url(rel_entry, src),
-                thumbnail_route=_find_video_thumbnail(abs_entry, src),
-                item_path=os.path.abspath(abs_entry),
-                media_type="video",
-                ext=os.path.splitext(entry)[1].lstrip(".").lower() or None
-            ))
-
-    if not candidates:
-        return []
-
-    sample_size = min(limit, len(candidates))
-    if sample_size <= 0:
-        return []
-
-    return random.sample(candidates, sample_size)
+        return [], None
+
+    # 蓄水池前段保有掃描順序，打亂後與 random.sample 一樣是隨機排列
+    random.shuffle(reservoir)
+    similar_items = []
+    for entry, abs_entry, media_type in reservoir:
+        rel_entry = rel_prefix + entry
+        stem, _, ext = entry.rpartition(".")
+        if media_type == "image":
+            url = _build_image_url(rel_entry, src)
+            thumbnail_route = _build_file_route(abs_entry, src)
+        else:
+            url = _build_video_url(rel_entry, src)
+            thumbnail_route = _find_video_thumbnail(abs_entry, src, image_names)
+        similar_items.append(MediaEntry(
+            id=rel_entry,
+            name=stem or entry,
+            url=url,
+            thumbnail_route=thumbnail_route,
+            item_path=os.path.abspath(abs_entry),
+            media_type=media_type,
+            ext=ext.lower() or None
+        ))
+    return similar_items, image_names
 
 
 def has_db_main() -> bool:
@@ -6,18 +6,27 @@ import mimetypes
 import os
 import sqlite3
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from itertools import repeat
 from typing import Dict, Iterable, List, Optional, Tuple
 
+try:  # Optional speedup; stdlib json is used when it is missing.
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 from config import DB_route_external
+from .models import _DATACLASS_SLOTS
 from .paths import (
     DEFAULT_THUMBNAIL_ROUTE,
     DEFAULT_VIDEO_THUMBNAIL_ROUTE,
+    IMAGE_EXTENSIONS,
+    VIDEO_EXTENSIONS,
     _build_file_route,
     _find_directory_thumbnail,
     _find_video_thumbnail,
-    _is_image_file,
-    _is_video_file,
+    _mime_for_ext,
     _normalize_slashes,
 )
 
@@ -26,7 +35,7 @@ ITEM_DB_PATH = os.path.join("data", "item_db.db")
 THUMBNAIL_DIR = os.path.join("data", "thumbnails", "items")
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ItemRecord:
     item_id: str
     name: str
@@ -49,11 +58,19 @@ class ItemRecord:
     is_censored: Optional[bool] = None
 
 
+_ITEM_DB_INITIALISED = False
+
+
 def _ensure_item_db() -> None:
     """Create the SQLite DB and base schema if missing."""
+    global _ITEM_DB_INITIALISED
+    if _ITEM_DB_INITIALISED:
+        return
     os.makedirs(os.path.dirname(ITEM_DB_PATH), exist_ok=True)
     conn = sqlite3.connect(ITEM_DB_PATH)
     try:
+        # page_size 只對新建的資料庫有效，且必須在切換 WAL 與建表之前設定
+        conn.execute("PRAGMA page_size=8192")
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute(
             """
@@ -97,12 +114,18 @@ def _ensure_item_db() -> None:
     finally:
         conn.commit()
         conn.close()
+    _ITEM_DB_INITIALISED = True
 
 
 def _get_db_connection():
     _ensure_item_db()
     conn = sqlite3.connect(ITEM_DB_PATH)
     conn.row_factory = sqlite3.Row
+    # 項目庫是可由檔案系統重建的衍生資料：WAL 下 NORMAL 已足夠安全並省去多數 fsync；
+    # 讀取走 mmap 並加大頁快取，減少 fetch_items 等重複讀取時的系統呼叫
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-131072")
     return conn
 
 
@@ -111,31 +134,19 @@ def _clean_tag(tag_name: str) -> Optional[str]:
     return cleaned or None
 
 
-def _extract_tags(tag_directory: str, base_dir: str) -> List[str]:
-    """Extract stacked tags from base_dir up to the current tag directory."""
-    relative = os.path.relpath(tag_directory, base_dir)
-    parts = _normalize_slashes(relative).split("/")
-    tags = []
-    for part in parts:
-        if part.startswith("#"):
-            cleaned = _clean_tag(part)
-            if cleaned:
-                tags.append(cleaned)
-    return tags
-
-
 def _compute_item_id(library_root: str, relative_path: str) -> str:
-    """Stable ID for an item, based on library root and relative path."""
-    base = f"{os.path.abspath(library_root)}::{_normalize_slashes(relative_path)}"
-    return hashlib.sha1(base.encode("utf-8", "ignore")).hexdigest()
+    """Stable ID for an item, based on the absolute library root and the normalised relative path."""
+    base = f"{library_root}::{relative_path}"
+    # 內部用的穩定 ID，不需要密碼學強度；blake2b（20 bytes，與舊 SHA-1 同長度）對短字串較快
+    return hashlib.blake2b(base.encode("utf-8", "ignore"), digest_size=20).hexdigest()
 
 
-def _detect_item_type(name: str, abs_path: str) -> str:
-    if os.path.isdir(abs_path):
+def _detect_item_type(ext: Optional[str], abs_path: str, is_dir: Optional[bool] = None) -> str:
+    if is_dir if is_dir is not None else os.path.isdir(abs_path):
         return "folder"
-    if _is_image_file(name):
+    if ext in IMAGE_EXTENSIONS:
         return "image"
-    if _is_video_file(name):
+    if ext in VIDEO_EXTENSIONS:
         return "video"
     return "file"
 
@@ -146,53 +157,102 @@ def _build_item_record(
     relative_path: str,
     base_dir: str,
     tags: List[str],
+    dir_entry: Optional[os.DirEntry] = None,
 ) -> ItemRecord:
-    ext = os.path.splitext(entry_name)[1].lstrip(".").lower() or None
-    mime_type, _ = mimetypes.guess_type(entry_name)
-    size_bytes = os.path.getsize(abs_path) if os.path.isfile(abs_path) else None
+    """Build a record; when ``dir_entry`` is given its cached type/stat data replaces extra syscalls.
+
+    ``base_dir`` and ``abs_path`` must already be absolute and ``relative_path`` already use
+    forward slashes; the crawlers resolve the root once and build relative paths per folder.
+    """
+    _, dot, ext = entry_name.rpartition(".")
+    ext = ext.lower() if dot and ext else None
+    # 查表只看最後一段副檔名；查不到時交給 mimetypes 看完整檔名，保留 .tar.gz 這類複合類型
+    mime_type = _mime_for_ext(ext) or (mimetypes.guess_type(entry_name)[0] if ext else None)
+    if dir_entry is not None:
+        is_dir = dir_entry.is_dir()
+        size_bytes = dir_entry.stat().st_size if dir_entry.is_file() else None
+    else:
+        is_dir = None
+        size_bytes = os.path.getsize(abs_path) if os.path.isfile(abs_path) else None
     return ItemRecord(
         item_id=_compute_item_id(base_dir, relative_path),
         name=entry_name,
         data_source="filesystem",
-        item_type=_detect_item_type(entry_name, abs_path),
+        item_type=_detect_item_type(ext, abs_path, is_dir),
         tags=tags,
-        relative_path=_normalize_slashes(relative_path),
-        absolute_path=os.path.abspath(abs_path),
-        library_root=os.path.abspath(base_dir),
+        relative_path=relative_path,
+        absolute_path=abs_path,
+        library_root=base_dir,
         ext=ext,
         mime_type=mime_type,
         size_bytes=size_bytes,
     )
 
 
-def iter_tagged_items(base_dir: str) -> Iterable[ItemRecord]:
-    """Yield ItemRecord objects for every item found under tagged folders."""
+def iter_tagged_items(base_dir: str, known_paths: Optional[Dict[str, str]] = None) -> Iterable[ItemRecord]:
+    """Yield ItemRecord objects for every item found under tagged folders.
+
+    When ``known_paths`` (relative_path -> item_id) is given, entries already in it are
+    popped from the mapping instead of being built and yielded; what remains afterwards
+    was not found by the crawl.
+    """
+    return _walk_library_items(base_dir, known_paths, include_root=False)
+
+
+def _walk_library_items(
+    base_dir: str,
+    known_paths: Optional[Dict[str, str]] = None,
+    include_root: bool = True,
+) -> Iterable[ItemRecord]:
+    """Single scandir walk behind the crawlers; ``include_root`` also yields root-level items."""
     if not base_dir:
         raise FileNotFoundError("Base directory is not configured.")
     base_dir = os.path.abspath(base_dir)
     if not os.path.isdir(base_dir):
         raise FileNotFoundError(base_dir)
 
-    for root, _, _ in os.walk(base_dir):
-        if not os.path.basename(root).startswith("#"):
-            continue
-
-        tags = _extract_tags(root, base_dir)
+    # 迭代走訪：(目錄路徑, 相對路徑, 累積標籤, 是否產出此層項目)；# 標籤資料夾一律產出，
+    # 根目錄視 include_root 而定（與 iter_root_items 相同的規則），如此根目錄只需列舉一次。
+    # 非標籤資料夾也要往下走（例如 other/#dogs），但隱藏資料夾與符號連結資料夾直接略過。
+    stack = [(base_dir, "", [], include_root)]
+    while stack:
+        dir_path, rel_dir, tags, yield_entries = stack.pop()
         try:
-            entries = os.listdir(root)
-        except (FileNotFoundError, PermissionError):
+            with os.scandir(dir_path) as it:
+                dir_entries = list(it)
+        except (FileNotFoundError, PermissionError, NotADirectoryError):
             continue
 
-        for entry in entries:
-            if entry.startswith(".") or entry.startswith("#"):
+        # rel_dir 已是正規化的 / 路徑；逐筆只需接上檔名
+        rel_prefix = f"{rel_dir}/" if rel_dir else ""
+        subdirs = []
+        for dir_entry in dir_entries:
+            name = dir_entry.name
+            # 隱藏項目在組路徑或查型別（Windows 上 is_dir 可能觸發 stat）之前就略過
+            first_char = name[:1]
+            if first_char == ".":
                 continue
-            abs_entry = os.path.join(root, entry)
-            rel_entry = os.path.relpath(abs_entry, base_dir)
-            yield _build_item_record(entry, abs_entry, rel_entry, base_dir, tags)
-
-
-def iter_root_items(base_dir: str) -> Iterable[ItemRecord]:
-    """Yield ItemRecord objects for items directly under the base directory."""
+            rel_entry = rel_prefix + _normalize_slashes(name)
+            if dir_entry.is_dir(follow_symlinks=False):
+                if first_char == "#":
+                    cleaned = _clean_tag(name)
+                    subdirs.append((dir_entry.path, rel_entry, tags + [cleaned] if cleaned else tags, True))
+                else:
+                    subdirs.append((dir_entry.path, rel_entry, tags, False))
+            if yield_entries and first_char != "#":
+                # 已入庫的項目不必再 stat、查 MIME 與建立 ItemRecord
+                if known_paths is not None and known_paths.pop(rel_entry, None) is not None:
+                    continue
+                yield _build_item_record(name, dir_entry.path, rel_entry, base_dir, tags, dir_entry)
+
+        stack.extend(reversed(subdirs))
+
+
+def iter_root_items(base_dir: str, known_paths: Optional[Dict[str, str]] = None) -> Iterable[ItemRecord]:
+    """Yield ItemRecord objects for items directly under the base directory.
+
+    ``known_paths`` behaves as in :func:`iter_tagged_items`.
+    """
     if not base_dir:
         raise FileNotFoundError("Base directory is not configured.")
     base_dir = os.path.abspath(base_dir)
@@ -200,68 +260,59 @@ def iter_root_items(base_dir: str) -> Iterable[ItemRecord]:
         raise FileNotFoundError(base_dir)
 
     try:
-        entries = os.listdir(base_dir)
+        with os.scandir(base_dir) as it:
+            dir_entries = list(it)
     except (FileNotFoundError, PermissionError):
         return
 
-    for entry in entries:
+    for dir_entry in dir_entries:
+        entry = dir_entry.name
         if entry.startswith(".") or entry.startswith("#"):
             continue
-        abs_entry = os.path.join(base_dir, entry)
-        rel_entry = os.path.relpath(abs_entry, base_dir)
-        yield _build_item_record(entry, abs_entry, rel_entry, base_dir, [])
+        rel_entry = _normalize_slashes(entry)
+        if known_paths is not None and known_paths.pop(rel_entry, None) is not None:
+            continue
+        yield _build_item_record(entry, dir_entry.path, rel_entry, base_dir, [], dir_entry)
+
+
+def _json_text(values) -> str:
+    """Encode ``values`` as UTF-8 JSON text, preferring orjson."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(values).decode("utf-8")
+        except TypeError:  # 例如含 surrogate escape 的檔名，交給 stdlib json 處理
+            pass
+    return json.dumps(values, ensure_ascii=False)
 
 
 def _serialise_optional_list(values: Optional[List[str]]) -> Optional[str]:
     if not values:
         return None
-    return json.dumps(values, ensure_ascii=False)
+    return _json_text(values)
 
 
 def _parse_json_list(value: Optional[str]) -> List[str]:
     if not value:
         return []
     try:
-        parsed = json.loads(value)
+        parsed = orjson.loads(value) if orjson is not None else json.loads(value)
         return parsed if isinstance(parsed, list) else []
     except Exception:
         return []
 
 
-def _get_video_duration_seconds(abs_video_path: str) -> Optional[float]:
-    """Get video duration using ffprobe if available."""
-    cmd = [
-        "ffprobe",
-        "-v",
-        "error",
-        "-show_entries",
-        "format=duration",
-        "-of",
-        "default=noprint_wrappers=1:nokey=1",
-        abs_video_path,
-    ]
-    try:
-        output = subprocess.check_output(cmd, stderr=subprocess.DEVNULL, text=True).strip()
-        return float(output)
-    except Exception:
-        return None
-
+# 取固定秒數的畫格，省去先跑 ffprobe 查片長；不到 5 秒的短片改取結尾前一秒
+_THUMBNAIL_SEEKS = (("-ss", "5"), ("-sseof", "-1"))
 
-def _generate_video_thumbnail(abs_video_path: str) -> Optional[str]:
-    """Generate a thumbnail for a video using the middle frame."""
-    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
-    duration = _get_video_duration_seconds(abs_video_path)
-    midpoint = max(duration / 2.0, 1.0) if duration else 1.0
-    file_hash = hashlib.sha1(abs_video_path.encode("utf-8", "ignore")).hexdigest()
-    output_path = os.path.abspath(os.path.join(THUMBNAIL_DIR, f"{file_hash}.jpg"))
 
+def _run_ffmpeg_frame(seek_args: Tuple[str, ...], abs_video_path: str, output_path: str) -> bool:
+    """Extract one frame with ``seek_args`` placed before ``-i``; True when a frame was written."""
     cmd = [
         "ffmpeg",
         "-y",
         "-v",
         "error",
-        "-ss",
-        str(midpoint),
+        *seek_args,
         "-i",
         abs_video_path,
         "-vframes",
@@ -272,12 +323,50 @@ def _generate_video_thumbnail(abs_video_path: str) -> Optional[str]:
     ]
     try:
         subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        return _build_file_route(output_path, "external")
     except Exception:
-        return None
+        return False
+    # seek 超過片長時 ffmpeg 可能正常結束卻沒有輸出任何畫格
+    return os.path.isfile(output_path)
+
 
+def _generate_video_thumbnail(abs_video_path: str, reuse_existing: bool = True) -> Optional[str]:
+    """Generate a thumbnail for a video from a frame a few seconds in (near the end for short clips).
 
-def _resolve_thumbnail_route(item_type: str, abs_path: str) -> str:
+    The output path is deterministic, so an existing file is reused; with ``reuse_existing`` False
+    it is only re-rendered when the video has been modified since the thumbnail was written.
+    """
+    file_hash = hashlib.sha1(abs_video_path.encode("utf-8", "ignore")).hexdigest()
+    output_path = os.path.abspath(os.path.join(THUMBNAIL_DIR, f"{file_hash}.jpg"))
+    try:
+        output_mtime = os.stat(output_path).st_mtime
+    except OSError:
+        output_mtime = None
+    if output_mtime is not None:
+        if reuse_existing:
+            return _build_file_route(output_path, "external")
+        # 強制重建時，影片在縮圖產生後沒有變動就沿用，省去重跑 ffmpeg
+        try:
+            if output_mtime >= os.stat(abs_video_path).st_mtime:
+                return _build_file_route(output_path, "external")
+        except OSError:
+            pass
+
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    # 先寫到暫存檔（保留 .jpg 讓 ffmpeg 選對格式），成功才取代正式檔；失敗時舊縮圖不受影響
+    temp_path = os.path.abspath(os.path.join(THUMBNAIL_DIR, f"{file_hash}.tmp.jpg"))
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+
+    for seek_args in _THUMBNAIL_SEEKS:
+        if _run_ffmpeg_frame(seek_args, abs_video_path, temp_path):
+            os.replace(temp_path, output_path)
+            return _build_file_route(output_path, "external")
+    return None
+
+
+def _resolve_thumbnail_route(item_type: str, abs_path: str, regenerate: bool = False) -> str:
     """Determine thumbnail route for the given item path."""
     if not os.path.exists(abs_path):
         return DEFAULT_THUMBNAIL_ROUTE
@@ -289,7 +378,7 @@ def _resolve_thumbnail_route(item_type: str, abs_path: str) -> str:
         return _build_file_route(abs_path, "external")
 
     if item_type == "video":
-        generated = _generate_video_thumbnail(abs_path)
+        generated = _generate_video_thumbnail(abs_path, reuse_existing=not regenerate)
         if generated:
             return generated
         found = _find_video_thumbnail(abs_path, "external")
@@ -298,6 +387,82 @@ def _resolve_thumbnail_route(item_type: str, abs_path: str) -> str:
     return DEFAULT_THUMBNAIL_ROUTE
 
 
+_INSERT_BATCH_SIZE = 1000
+# 不指定衝突目標：item_id 或 (library_root, relative_path) 任一重複都視為已存在。
+# 舊版以 SHA-1 產生的 item_id 因此會原樣保留，而不是在路徑唯一索引上報錯。
+_INSERT_ITEM_SQL = """
+    INSERT INTO items (
+        item_id, name, data_source, item_type, tags,
+        actors, authors, face_ids, is_archived, thumbnail_route,
+        region, rating, is_censored, relative_path, absolute_path,
+        library_root, ext, mime_type, size_bytes, updated_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT DO NOTHING
+"""
+
+
+def _item_insert_params(record: ItemRecord, tags_json_cache: Dict[Tuple[str, ...], str]) -> Tuple:
+    # 同一標籤資料夾下的項目共用同一組 tags，序列化結果按 tuple(tags) 重用
+    tags_key = tuple(record.tags)
+    tags_json = tags_json_cache.get(tags_key)
+    if tags_json is None:
+        tags_json = tags_json_cache[tags_key] = _json_text(record.tags)
+    return (
+        record.item_id,
+        record.name,
+        record.data_source,
+        record.item_type,
+        tags_json,
+        _serialise_optional_list(record.actors) if record.actors else None,
+        _serialise_optional_list(record.authors) if record.authors else None,
+        _serialise_optional_list(record.face_ids) if record.face_ids else None,
+        1 if record.is_archived else 0,
+        record.thumbnail_route,
+        record.region,
+        record.rating,
+        1 if record.is_censored else 0 if record.is_censored is not None else None,
+        record.relative_path,
+        record.absolute_path,
+        record.library_root,
+        record.ext,
+        record.mime_type,
+        record.size_bytes,
+    )
+
+
+def _insert_item_batch(
+    conn: sqlite3.Connection,
+    batch: List[ItemRecord],
+    tags_json_cache: Dict[Tuple[str, ...], str],
+    errors: List[Tuple[str, str]],
+) -> int:
+    """Insert one batch in its own write transaction and return how many rows were actually added.
+
+    The write lock is only held while the batch is written, so other connections
+    (thumbnail updates, clears) are not blocked for the whole filesystem walk.
+    """
+    # 直接以 IMMEDIATE 取得寫入鎖，不會在中途升級鎖時撞上 SQLITE_BUSY
+    conn.execute("BEGIN IMMEDIATE")
+    before = conn.total_changes
+    try:
+        conn.executemany(
+            _INSERT_ITEM_SQL,
+            [_item_insert_params(record, tags_json_cache) for record in batch],
+        )
+    except sqlite3.DatabaseError:  # pragma: no cover - defensive
+        # executemany 在第一個錯誤就停下；逐筆重跑這批（已寫入的會走 DO NOTHING），記錄出錯的項目
+        for record in batch:
+            try:
+                conn.execute(_INSERT_ITEM_SQL, _item_insert_params(record, tags_json_cache))
+            except sqlite3.DatabaseError as exc:
+                errors.append((record.relative_path, str(exc)))
+    # ON CONFLICT DO NOTHING 不計入 total_changes，差值即為實際新增筆數
+    added = conn.total_changes - before
+    conn.commit()
+    return added
+
+
 def update_item_database(base_dir: Optional[str] = None) -> Dict[str, object]:
     """Crawl tagged folders and persist new items into the central DB.
 
@@ -305,69 +470,56 @@ def update_item_database(base_dir: Optional[str] = None) -> Dict[str, object]:
     records whose paths no longer exist are cleaned up.
     """
     target_dir = os.path.abspath(base_dir or DB_route_external)
-    records = list(iter_root_items(target_dir)) + list(iter_tagged_items(target_dir))
+    # 爬取改為邊走訪邊寫入；先確認根目錄存在，避免在清理舊資料後才發現路徑錯誤
+    if not os.path.isdir(target_dir):
+        raise FileNotFoundError(target_dir)
 
+    seen = 0
     inserted = 0
-    skipped = 0
     removed = 0
     errors: List[Tuple[str, str]] = []
+    tags_json_cache: Dict[Tuple[str, ...], str] = {}
 
     with _get_db_connection() as conn:
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # 爬取期間不持有寫入鎖：每批寫入與最後的清理各自是一個短交易
+        # 以路徑對照已入庫項目：爬蟲遇到的項目就從表中移除，只有剩下的少數項目才需要
+        # 用 os.path.exists 確認是否真的不存在（資料夾無法列舉時，其中的項目也會留在表中）。
         cur = conn.execute(
-            "SELECT item_id, absolute_path FROM items WHERE library_root = ?",
+            "SELECT item_id, relative_path FROM items WHERE library_root = ?",
             (target_dir,),
         )
+        unvisited_ids = {row["relative_path"]: row["item_id"] for row in cur}
+        known_count = len(unvisited_ids)
+
+        # 重新爬取時大多數項目早已入庫：爬蟲直接略過表中的路徑，連 ItemRecord 都不建立，
+        # 只把真正的新項目送進 INSERT；ON CONFLICT DO NOTHING 仍保留作為保險。
+        # 記錄以串流方式分批寫入，記憶體中最多只保留一批 ItemRecord。
+        batch: List[ItemRecord] = []
+        for record in _walk_library_items(target_dir, unvisited_ids):
+            seen += 1
+            batch.append(record)
+            if len(batch) >= _INSERT_BATCH_SIZE:
+                inserted += _insert_item_batch(conn, batch, tags_json_cache, errors)
+                batch = []
+        if batch:
+            inserted += _insert_item_batch(conn, batch, tags_json_cache, errors)
+        seen += known_count - len(unvisited_ids)
         missing_ids = [
-            row["item_id"] for row in cur.fetchall() if not os.path.exists(row["absolute_path"])
+            item_id
+            for relative_path, item_id in unvisited_ids.items()
+            if not os.path.exists(os.path.join(target_dir, relative_path))
         ]
         if missing_ids:
+            conn.execute("BEGIN IMMEDIATE")
             conn.executemany("DELETE FROM items WHERE item_id = ?", ((item_id,) for item_id in missing_ids))
+            conn.commit()
             removed = len(missing_ids)
-
-        for record in records:
-            try:
-                cur = conn.execute(
-                    """
-                    INSERT INTO items (
-                        item_id, name, data_source, item_type, tags,
-                        actors, authors, face_ids, is_archived, thumbnail_route,
-                        region, rating, is_censored, relative_path, absolute_path,
-                        library_root, ext, mime_type, size_bytes, updated_at
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                    ON CONFLICT(item_id) DO NOTHING
-                    """,
-                    (
-                        record.item_id,
-                        record.name,
-                        record.data_source,
-                        record.item_type,
-                        json.dumps(record.tags, ensure_ascii=False),
-                        _serialise_optional_list(record.actors),
-                        _serialise_optional_list(record.authors),
-                        _serialise_optional_list(record.face_ids),
-                        1 if record.is_archived else 0,
-                        record.thumbnail_route,
-                        record.region,
-                        record.rating,
-                        1 if record.is_censored else 0 if record.is_censored is not None else None,
-                        record.relative_path,
-                        record.absolute_path,
-                        record.library_root,
-                        record.ext,
-                        record.mime_type,
-                        record.size_bytes,
-                    ),
-                )
-                inserted += 1 if cur.rowcount == 1 else 0
-                skipped += 0 if cur.rowcount == 1 else 1
-            except sqlite3.DatabaseError as exc:  # pragma: no cover - defensive
-                errors.append((record.relative_path, str(exc)))
-        conn.commit()
+        skipped = seen - inserted - len(errors)
 
     return {
         "base_dir": target_dir,
-        "seen": len(records),
+        "seen": seen,
         "inserted": inserted,
         "skipped": skipped,
         "removed": removed,
@@ -376,50 +528,81 @@ def update_item_database(base_dir: Optional[str] = None) -> Dict[str, object]:
     }
 
 
+_THUMBNAIL_WORKERS = min(8, os.cpu_count() or 1)
+_THUMBNAIL_BATCH_SIZE = 500
+
+
+def _resolve_row_thumbnail(row: sqlite3.Row, regenerate: bool = False) -> Tuple[Optional[str], Optional[Exception]]:
+    """Worker wrapper: return ``(route, None)`` or ``(None, exc)`` so one failure does not stop the pool."""
+    try:
+        return _resolve_thumbnail_route(row["item_type"], row["absolute_path"], regenerate), None
+    except Exception as exc:  # pragma: no cover - defensive
+        return None, exc
+
+
+_UPDATE_THUMBNAIL_SQL = "UPDATE items SET thumbnail_route = ?, updated_at = CURRENT_TIMESTAMP WHERE item_id = ?"
+
+
 def update_missing_thumbnails(base_dir: Optional[str] = None, force: bool = False) -> Dict[str, object]:
-    """Populate thumbnail_route for items. Set force=True to rewrite all."""
+    """Populate thumbnail_route for items. Set force=True to rewrite all (re-rendering stale video frames)."""
     target_dir = os.path.abspath(base_dir or DB_route_external) if (base_dir or DB_route_external) else None
 
-    with _get_db_connection() as conn:
-        if force:
-            sql = "SELECT item_id, item_type, absolute_path, thumbnail_route FROM items"
-            params: Tuple = ()
-            if target_dir:
-                sql += " WHERE library_root = ?"
-                params = (target_dir,)
-            cur = conn.execute(sql, params)
-        else:
-            if target_dir:
-                cur = conn.execute(
-                    "SELECT item_id, item_type, absolute_path, thumbnail_route FROM items WHERE (thumbnail_route IS NULL OR thumbnail_route = '') AND library_root = ?",
-                    (target_dir,),
-                )
-            else:
-                cur = conn.execute(
-                    "SELECT item_id, item_type, absolute_path, thumbnail_route FROM items WHERE thumbnail_route IS NULL OR thumbnail_route = ''"
-                )
-        rows = cur.fetchall()
+    conditions: List[str] = []
+    params: Tuple = ()
+    if not force:
+        conditions.append("(thumbnail_route IS NULL OR thumbnail_route = '')")
+    if target_dir:
+        conditions.append("library_root = ?")
+        params = (target_dir,)
+    # 以 item_id 分頁（keyset）逐批讀取，記憶體只放一批；每批都是新查詢，寫回時不會有還開著的游標
+    conditions.append("item_id > ?")
+    sql = (
+        "SELECT item_id, item_type, absolute_path, thumbnail_route FROM items WHERE "
+        + " AND ".join(conditions)
+        + " ORDER BY item_id LIMIT ?"
+    )
 
-        updated = 0
-        errors: List[Tuple[str, str]] = []
+    seen = 0
+    updated = 0
+    errors: List[Tuple[str, str]] = []
 
-        for row in rows:
+    with _get_db_connection() as conn, ThreadPoolExecutor(max_workers=_THUMBNAIL_WORKERS) as executor:
+        last_id = ""
+        while True:
+            rows = conn.execute(sql, params + (last_id, _THUMBNAIL_BATCH_SIZE)).fetchall()
+            if not rows:
+                break
+            seen += len(rows)
+            last_id = rows[-1]["item_id"]
+
+            updates: List[Tuple[str, str]] = []
+            paths_by_id: Dict[str, str] = {}
+            # 影片縮圖要跑 ffmpeg 子程序，時間都花在等待外部程序：用執行緒平行處理即可
+            for row, (route, exc) in zip(rows, executor.map(_resolve_row_thumbnail, rows, repeat(force))):
+                if exc is not None:
+                    errors.append((row["absolute_path"], str(exc)))
+                    continue
+                updates.append((route, row["item_id"]))
+                paths_by_id[row["item_id"]] = row["absolute_path"]
+
+            # 整批寫回；批次失敗時改逐筆執行，保留出錯項目的紀錄
             try:
-                route = _resolve_thumbnail_route(row["item_type"], row["absolute_path"])
-                conn.execute(
-                    "UPDATE items SET thumbnail_route = ?, updated_at = CURRENT_TIMESTAMP WHERE item_id = ?",
-                    (route, row["item_id"]),
-                )
-                updated += 1
-            except Exception as exc:  # pragma: no cover - defensive
-                errors.append((row["absolute_path"], str(exc)))
+                conn.executemany(_UPDATE_THUMBNAIL_SQL, updates)
+                updated += len(updates)
+            except sqlite3.DatabaseError:  # pragma: no cover - defensive
+                for update in updates:
+                    try:
+                        conn.execute(_UPDATE_THUMBNAIL_SQL, update)
+                        updated += 1
+                    except sqlite3.DatabaseError as exc:
+                        errors.append((paths_by_id[update[1]], str(exc)))
 
         conn.commit()
 
     return {
         "base_dir": target_dir,
         "updated": updated,
-        "pending": len(rows) - updated,
+        "pending": seen - updated,
         "errors": errors,
         "db_path": os.path.abspath(ITEM_DB_PATH),
     }
@@ -450,13 +633,24 @@ def fetch_items(limit: int = 500, offset: int = 0) -> Dict[str, object]:
         )
         rows = cur.fetchall()
 
+    # 同一標籤資料夾的項目存的是同一串 JSON；每種字串只解碼一次，空欄位直接給空串列
+    decoded_lists: Dict[str, List[str]] = {}
+
+    def parse_list(value: Optional[str]) -> List[str]:
+        if not value:
+            return []
+        parsed = decoded_lists.get(value)
+        if parsed is None:
+            parsed = decoded_lists[value] = _parse_json_list(value)
+        return parsed
+
     items = []
     for row in rows:
         items.append({
             "item_id": row["item_id"],
             "name": row["name"],
             "item_type": row["item_type"],
-            "tags": _parse_json_list(row["tags"]),
+            "tags": parse_list(row["tags"]),
             "thumbnail_route": row["thumbnail_route"],
             "relative_path": row["relative_path"],
             "absolute_path": row["absolute_path"],
@@ -469,9 +663,9 @@ def fetch_items(limit: int = 500, offset: int = 0) -> Dict[str, object]:
             "region": row["region"],
             "rating": row["rating"],
             "is_censored": None if row["is_censored"] is None else bool(row["is_censored"]),
-            "actors": _parse_json_list(row["actors"]),
-            "authors": _parse_json_list(row["authors"]),
-            "face_ids": _parse_json_list(row["face_ids"]),
+            "actors": parse_list(row["actors"]),
+            "authors": parse_list(row["authors"]),
+            "face_ids": parse_list(row["face_ids"]),
             "updated_at": row["updated_at"],
         })
 
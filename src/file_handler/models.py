@@ -1,7 +1,8 @@
 """Shared data models and domain exceptions for Flowinone file handling."""
 
-from dataclasses import asdict, dataclass
-from typing import Any, Dict, List, Optional
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
 
 
 class MediaError(Exception):
@@ -32,7 +33,26 @@ class BookmarkNotFound(BookmarkError):
     """Bookmark folder or entry not found."""
 
 
-@dataclass
+# 列表頁與爬取會大量建立這些物件；3.10+ 以 __slots__ 省去每個實例的 __dict__（3.9 的 dataclass 不支援 slots）
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _compact_dict(obj, field_names: Sequence[str]) -> Dict[str, Any]:
+    """Shallow field map without ``None`` values.
+
+    ``dataclasses.asdict`` deep-copies every nested list/dict; the results here only feed
+    templates and JSON responses, so the field values are passed through as-is.
+    ``field_names`` is the class's precomputed field tuple (same order as its slots).
+    """
+    data = {}
+    for name in field_names:
+        value = getattr(obj, name)
+        if value is not None:
+            data[name] = value
+    return data
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class MediaDetail:
     name: str
     relative_path: str
@@ -49,10 +69,10 @@ class MediaDetail:
     ext: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return {k: v for k, v in asdict(self).items() if v is not None}
+        return _compact_dict(self, _MEDIA_DETAIL_FIELDS)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class MediaEntry:
     name: str
     url: str
@@ -62,19 +82,19 @@ class MediaEntry:
     path: Optional[str] = None
     ext: Optional[str] = None
     description: Optional[str] = None
-    folder_labels: Optional[List[str]] = None
+    folder_labels: Optional[Sequence[str]] = None
     path_display: Optional[str] = None
     id: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dict, omitting empty optional values."""
-        data = {k: v for k, v in asdict(self).items() if v is not None}
+        data = _compact_dict(self, _MEDIA_ENTRY_FIELDS)
         if "path" not in data and "url" in data:
             data["path"] = data["url"]
         return data
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class PageMetadata:
     name: str
     category: str
@@ -83,7 +103,7 @@ class PageMetadata:
     thumbnail_route: str
     filesystem_path: Optional[str] = None
     folders: Optional[List[Dict[str, Any]]] = None
-    similar: Optional[List[Dict[str, Any]]] = None
+    similar: Optional[List[Any]] = None  # MediaEntry 或已轉好的 dict
     description: Optional[str] = None
     ext: Optional[str] = None
     focus_modes: Optional[List[Dict[str, Any]]] = None
@@ -92,7 +112,21 @@ class PageMetadata:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dict, omitting empty optional values."""
-        return {k: v for k, v in asdict(self).items() if v is not None}
+        data = _compact_dict(self, _PAGE_METADATA_FIELDS)
+        if self.similar:
+            data["similar"] = entries_to_dicts(self.similar)
+        return data
+
+
+# 欄位名稱在類別定義後就固定：預先取成 tuple，轉換時不必每次走訪 __dataclass_fields__
+_MEDIA_DETAIL_FIELDS = tuple(MediaDetail.__dataclass_fields__)
+_MEDIA_ENTRY_FIELDS = tuple(MediaEntry.__dataclass_fields__)
+_PAGE_METADATA_FIELDS = tuple(PageMetadata.__dataclass_fields__)
+
+
+def entries_to_dicts(entries) -> List[Any]:
+    """Convert a listing in one pass; items without ``to_dict`` (already dicts) pass through."""
+    return [item.to_dict() if hasattr(item, "to_dict") else item for item in entries]
 
 
 __all__ = [
@@ -106,4 +140,5 @@ __all__ = [
     "MediaDetail",
     "MediaNotFound",
     "PageMetadata",
+    "entries_to_dicts",
 ]
@@ -1,59 +1,113 @@
 """Path, URL, and type helpers for Flowinone file handling."""
 
 import hashlib
+import mimetypes
 import os
+import string
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
 from urllib.parse import quote
 
 from .models import AccessDenied, FolderNotFound
 
 
-IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
-VIDEO_EXTENSIONS = {"mp4", "mov", "avi", "mkv", "webm", "m4v"}
+IMAGE_EXTENSIONS = frozenset({"png", "jpg", "jpeg", "gif", "webp"})
+VIDEO_EXTENSIONS = frozenset({"mp4", "mov", "avi", "mkv", "webm", "m4v"})
 DEFAULT_THUMBNAIL_ROUTE = "/static/default_thumbnail.svg"
 DEFAULT_VIDEO_THUMBNAIL_ROUTE = "/static/default_video_thumbnail.svg"
 GENERATED_THUMBNAIL_DIR = os.path.join("data", "thumbnails", "items")
 
 
+# 其他模組沿用此函式；本模組的網址建構則直接內聯同一個判斷，省去每次的函式呼叫
 def _normalize_source(src):
     return "external" if src == "external" else "internal"
 
 
 def _normalize_slashes(path):
-    return path.replace("\\", "/")
+    # 多數路徑本來就沒有反斜線：先用 in 掃一次，省去 replace 重新配置字串
+    return path if "\\" not in path else path.replace("\\", "/")
 
 
-def _is_image_file(filename):
-    return os.path.splitext(filename)[1].lower().lstrip(".") in IMAGE_EXTENSIONS
+def _has_extension_in(filename, extensions):
+    # 多數檔名在 rpartition 查表就被排除；命中時才用 splitext 確認（".jpg" 這類隱藏檔沒有副檔名）
+    _, dot, ext = filename.rpartition(".")
+    return bool(dot) and ext.lower() in extensions and bool(os.path.splitext(filename)[1])
 
 
-def _is_video_file(filename):
-    return os.path.splitext(filename)[1].lower().lstrip(".") in VIDEO_EXTENSIONS
+def _is_image_file(filename):
+    return _has_extension_in(filename, IMAGE_EXTENSIONS)
 
 
+def _is_video_file(filename):
+    return _has_extension_in(filename, VIDEO_EXTENSIONS)
+
+
+# 支援的媒體格式直接查表（不受系統 mime.types 影響）；表外的副檔名才交給 mimetypes
+_EXT_TO_MIME = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "mp4": "video/mp4",
+    "m4v": "video/mp4",
+    "mov": "video/quicktime",
+    "avi": "video/x-msvideo",
+    "mkv": "video/x-matroska",
+    "webm": "video/webm",
+}
+
+
+@lru_cache(maxsize=256)
+def _mime_for_ext(ext):
+    """MIME 類型只取決於小寫副檔名；媒體庫的副檔名種類很少，按副檔名快取即可。"""
+    if not ext:
+        return None
+    return _EXT_TO_MIME.get(ext) or mimetypes.guess_type(f"x.{ext}")[0]
+
+
+# quote() 永不編碼的字元（RFC 3986 unreserved）加上各呼叫端的 safe 字元
+_QUOTE_ALWAYS_SAFE = frozenset(string.ascii_letters + string.digits + "_.-~")
+_UNQUOTED_CHARS = {
+    "/": _QUOTE_ALWAYS_SAFE | {"/"},
+    "/:": _QUOTE_ALWAYS_SAFE | {"/", ":"},
+}
+
+
+def _quote_path(path, safe="/"):
+    """quote() 的快速路徑：多數路徑只含英數與 /._-，整串都不需編碼時直接回傳原字串。"""
+    if _UNQUOTED_CHARS[safe].issuperset(path):
+        return path
+    return quote(path, safe=safe)
+
+
+# 路由與網址只取決於路徑字串與來源：同一資料夾被重複瀏覽（翻頁、返回）時直接重用 quote 的結果
+@lru_cache(maxsize=4096)
 def _build_file_route(abs_path, src):
     normalized = _normalize_slashes(abs_path)
-    quoted = quote(normalized, safe="/:")
+    quoted = _quote_path(normalized, safe="/:")
     if src == "external":
         return f"/serve_image/{quoted}"
     return f"/{quoted}"
 
 
+@lru_cache(maxsize=4096)
 def _build_image_url(rel_path, src):
-    normalized_src = _normalize_source(src)
     normalized_path = _normalize_slashes(rel_path or "")
-    quoted_path = quote(normalized_path, safe="/")
-    query = "?src=external" if normalized_src == "external" else "?src=internal"
+    quoted_path = _quote_path(normalized_path)
+    query = "?src=external" if src == "external" else "?src=internal"
     if quoted_path:
         return f"/image/{quoted_path}{query}"
     return f"/image/{query}"
 
 
+@lru_cache(maxsize=4096)
 def _build_folder_url(rel_path, src):
-    normalized_src = _normalize_source(src)
     normalized_path = _normalize_slashes(rel_path or "")
-    quoted_path = quote(normalized_path, safe="/")
+    quoted_path = _quote_path(normalized_path)
 
-    if normalized_src == "external":
+    if src == "external":
         return f"/both/{quoted_path}" if quoted_path else "/"
 
     if quoted_path:
@@ -61,23 +115,35 @@ def _build_folder_url(rel_path, src):
     return "/?src=internal"
 
 
+@lru_cache(maxsize=4096)
 def _build_video_url(rel_path, src):
     normalized = _normalize_slashes(rel_path)
-    quoted_path = quote(normalized, safe="/")
-    query = "?src=external" if _normalize_source(src) == "external" else "?src=internal"
+    quoted_path = _quote_path(normalized)
+    query = "?src=external" if src == "external" else "?src=internal"
     return f"/video/{quoted_path}{query}"
 
 
-def _find_video_thumbnail(abs_video_path, src):
-    base, _ = os.path.splitext(abs_video_path)
-    candidates = []
-    for ext in IMAGE_EXTENSIONS:
-        candidates.append(f"{base}_thumbnail.{ext}")
-        candidates.append(f"{base}.{ext}")
+# 影片旁縮圖的候選後綴（依序：<名稱>_thumbnail.<ext>、<名稱>.<ext>），載入時組好一次
+_VIDEO_THUMBNAIL_SUFFIXES = tuple(
+    suffix for ext in IMAGE_EXTENSIONS for suffix in (f"_thumbnail.{ext}", f".{ext}")
+)
+
 
-    for candidate in candidates:
-        if os.path.isfile(candidate):
-            return _build_file_route(candidate, src)
+def _find_video_thumbnail(abs_video_path, src, sibling_names=None):
+    """找影片旁的縮圖；呼叫端已列過同資料夾時，以 ``sibling_names``（非目錄的檔名集合）查表。
+
+    未提供時逐一 isfile 探測候選檔名，不必為單一影片列舉整個資料夾。
+    """
+    parent, video_name = os.path.split(abs_video_path)
+    stem, _ = os.path.splitext(video_name)
+    for suffix in _VIDEO_THUMBNAIL_SUFFIXES:
+        candidate = stem + suffix
+        if sibling_names is None:
+            candidate_path = os.path.join(parent, candidate)
+            if os.path.isfile(candidate_path):
+                return _build_file_route(candidate_path, src)
+        elif candidate in sibling_names:
+            return _build_file_route(os.path.join(parent, candidate), src)
 
     hashed_name = hashlib.sha1(os.path.abspath(abs_video_path).encode("utf-8", "ignore")).hexdigest()
     generated = os.path.abspath(os.path.join(GENERATED_THUMBNAIL_DIR, f"{hashed_name}.jpg"))
@@ -88,57 +154,122 @@ def _find_video_thumbnail(abs_video_path, src):
 
 
 def _find_directory_thumbnail(abs_folder_path, src):
-    for root, _, files in os.walk(abs_folder_path):
-        for file_name in sorted(files):
-            abs_file_path = os.path.join(root, file_name)
-            if _is_image_file(file_name):
+    # 與 os.walk 相同的順序（本層檔名排序後先找，再依列舉順序深度優先進入子資料夾、不跟隨連結），
+    # 但直接用 scandir 的 DirEntry 型別快取；找到第一個候選就返回，不再往下列舉
+    stack = [abs_folder_path]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        file_names, subdirs = [], []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                file_names.append(entry.name)
+                continue
+            try:
+                is_link = entry.is_symlink()
+            except OSError:
+                is_link = False
+            if not is_link:
+                subdirs.append(entry.path)
+
+        # 依檔名排序後第一個影像或影片即為候選：線性找最小者，不必排序整層
+        first_media = None
+        for file_name in file_names:
+            if (first_media is None or file_name < first_media) and (
+                _is_image_file(file_name) or _is_video_file(file_name)
+            ):
+                first_media = file_name
+        if first_media is not None:
+            abs_file_path = os.path.join(dir_path, first_media)
+            if _is_image_file(first_media):
                 return _build_file_route(abs_file_path, src)
-            if _is_video_file(file_name):
-                return _find_video_thumbnail(abs_file_path, src)
+            return _find_video_thumbnail(abs_file_path, src, frozenset(file_names))
+        stack.extend(reversed(subdirs))
     return DEFAULT_THUMBNAIL_ROUTE
 
 
+# 每個子資料夾的縮圖都要往下 scandir，在網路磁碟上延遲明顯；子資料夾夠多時改由執行緒池平行建立
+# （scandir/stat 期間會釋放 GIL），結果仍依原本順序排列。
+_FOLDER_PARALLEL_THRESHOLD = 8
+_FOLDER_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="folder-thumbnail")
+
+
 def _collect_directory_entries(base_dir, relative_path, src,
                                folder_builder, image_builder, video_builder):
-    normalized_src = _normalize_source(src)
+    normalized_src = "external" if src == "external" else "internal"
     target_dir = os.path.join(base_dir, relative_path) if relative_path else base_dir
     if not os.path.isdir(target_dir):
         raise FolderNotFound(f"Directory not found: {target_dir}")
 
+    # scandir 一次取得名稱與型別（d_type），不必再對每一筆呼叫 os.path.isdir；
+    # 隱藏項目在排序前就濾掉，排序鍵與原本的 sorted(os.listdir()) 相同
     try:
-        entries = sorted(os.listdir(target_dir))
+        with os.scandir(target_dir) as it:
+            entries = [dir_entry for dir_entry in it if not dir_entry.name.startswith(".")]
     except FileNotFoundError:
         raise FolderNotFound(f"Directory not found: {target_dir}")
-
-    folders, files = [], []
-    for entry in entries:
-        if entry.startswith("."):
+    entries.sort(key=attrgetter("name"))
+
+    # relpath / abspath 都會呼叫 getcwd 並 normpath；對整個目錄只算一次，逐筆改用字串拼接
+    rel_dir = _normalize_slashes(os.path.relpath(target_dir, base_dir))
+    rel_prefix = "" if rel_dir == "." else f"{rel_dir}/"
+    target_abs = os.path.abspath(target_dir)
+
+    folder_jobs, files, pending = [], [], []
+    file_names = set()
+    for dir_entry in entries:
+        entry = dir_entry.name
+        abs_entry = dir_entry.path
+        rel_entry = rel_prefix + entry
+        item_path = os.path.join(target_abs, entry)
+
+        # 與 os.path.isdir 相同會跟隨符號連結；只有連結項目才需要額外 stat
+        if dir_entry.is_dir():
+            folder_jobs.append((entry, abs_entry, rel_entry, normalized_src, item_path))
             continue
-        abs_entry = os.path.join(target_dir, entry)
-        rel_entry = os.path.relpath(abs_entry, base_dir)
-        rel_entry = _normalize_slashes(rel_entry)
+        file_names.add(entry)
+        _, dot, ext = entry.rpartition(".")
+        ext = ext.lower() if dot else ""
+        if ext in IMAGE_EXTENSIONS:
+            pending.append((image_builder, entry, abs_entry, rel_entry, item_path))
+        elif ext in VIDEO_EXTENSIONS:
+            pending.append((video_builder, entry, abs_entry, rel_entry, item_path))
+
+    if len(folder_jobs) >= _FOLDER_PARALLEL_THRESHOLD:
+        folders = list(_FOLDER_EXECUTOR.map(lambda job: folder_builder(*job), folder_jobs))
+    else:
+        folders = [folder_builder(*job) for job in folder_jobs]
+
+    # 等整個目錄分類完再建立檔案項目：影片縮圖改查這次列出的檔名，不再逐一 isfile
+    for builder, entry, abs_entry, rel_entry, item_path in pending:
+        if builder is video_builder:
+            files.append(builder(entry, abs_entry, rel_entry, normalized_src, item_path, sibling_names=file_names))
+        else:
+            files.append(builder(entry, abs_entry, rel_entry, normalized_src, item_path))
+
+    # 資料夾在前、檔案在後；就地接上，不另外配置合併後的新串列
+    folders.extend(files)
+    return folders
 
-        if os.path.isdir(abs_entry):
-            folders.append(folder_builder(entry, abs_entry, rel_entry, normalized_src))
-        elif _is_image_file(entry):
-            files.append(image_builder(entry, abs_entry, rel_entry, normalized_src))
-        elif _is_video_file(entry):
-            files.append(video_builder(entry, abs_entry, rel_entry, normalized_src))
 
-    return folders + files
+_SIZE_UNITS = ("KB", "MB", "GB", "TB", "PB")
 
 
 def _human_readable_size(num_bytes):
     if num_bytes < 1024:
         return f"{num_bytes} B"
-    units = ["KB", "MB", "GB", "TB", "PB"]
-    size = float(num_bytes)
-    for unit in units:
-        size /= 1024.0
-        if size < 1024.0 or unit == units[-1]:
-            return f"{size:.2f} {unit}"
-
-    return f"{size:.2f} PB"
+    # 每個單位差 2**10：由位元長度直接算出單位，只做一次除法
+    unit_index = min((num_bytes.bit_length() - 1) // 10 - 1, len(_SIZE_UNITS) - 1)
+    return f"{num_bytes / (1 << (10 * (unit_index + 1))):.2f} {_SIZE_UNITS[unit_index]}"
 
 
 def _safe_relative_path(path):